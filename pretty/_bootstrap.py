@@ -0,0 +1,310 @@
+from __future__ import annotations
+
+# NOTE: this module is imported by pretty.pth at every Python startup
+#       and must thus only import modules that site has already
+#       imported. notably, this excludes typing, so TYPE_CHECKING is
+#       spelled out by hand.
+TYPE_CHECKING = False
+
+if TYPE_CHECKING:
+    from collections.abc import Callable, Sequence
+    from importlib.machinery import ModuleSpec
+    from types import ModuleType, TracebackType
+    from typing import Any
+
+    UnraisableHookArgs = Any
+
+import _thread
+import os
+import sys
+
+
+# NOTE: these mirror pretty.utility.environment, which cannot be
+#       imported here without importing the whole of pretty.utility.
+_environment_root = "PYTHONPRETTY"
+_environment_traceback = "PYTHONPRETTYTRACEBACK"
+_value_bool_map = {
+    **dict.fromkeys(["0", "false", "off", "disable", "no", "n"], False),
+    **dict.fromkeys(["1", "true", "on", "enable", "yes", "y"], True),
+}
+
+
+_traceback_names = (
+    "extract_stack",
+    "extract_tb",
+    "format_exc",
+    "format_exception",
+    "format_exception_only",
+    "format_list",
+    "format_stack",
+    "format_tb",
+    "print_exc",
+    "print_exception",
+    "print_last",
+    "print_list",
+    "print_stack",
+    "print_tb",
+    "walk_stack",
+    "walk_tb",
+)
+
+# NOTE: when these are called without a frame they use the caller's
+#       frame, which would otherwise be the trampoline.
+_traceback_frame_names = (
+    "extract_stack",
+    "format_stack",
+    "print_stack",
+    "walk_stack",
+)
+
+
+_lock = _thread.RLock()
+_loaded = False
+_loading = False
+
+_excepthook: Callable[[type[BaseException], BaseException, TracebackType | None], Any] | None = None
+_unraisablehook: Callable[[UnraisableHookArgs], Any] | None = None
+_traceback_originals: dict[str, Any] = dict()
+_traceback_stubs: dict[str, Any] = dict()
+
+
+def _get_environment_boolean(
+    name: str,
+    /,
+) -> bool | None:
+    return _value_bool_map.get(os.environ.get(name))  # type: ignore  # None is not a key
+
+
+def _excepthook_stub(
+    type: type[BaseException],
+    value: BaseException,
+    traceback: TracebackType | None,
+    /,
+) -> Any:
+    _load()
+
+    excepthook = sys.excepthook
+    if excepthook is _excepthook_stub:
+        excepthook = _excepthook or sys.__excepthook__
+
+    return excepthook(type, value, traceback)
+
+
+def _unraisablehook_stub(
+    unraisable: UnraisableHookArgs,
+    /,
+) -> Any:
+    _load()
+
+    unraisablehook = sys.unraisablehook
+    if unraisablehook is _unraisablehook_stub:
+        unraisablehook = _unraisablehook or sys.__unraisablehook__
+
+    return unraisablehook(unraisable)
+
+
+def _make_traceback_stub(
+    name: str,
+    /,
+) -> Callable[..., Any]:
+    takes_frame = name in _traceback_frame_names
+
+    # NOTE: in older versions, walk_stack is a generator which looks
+    #       up the frame when it is first iterated, by which time the
+    #       trampoline has already returned.
+    if takes_frame and getattr(_traceback_originals[name], "__code__", None) is not None:
+        takes_frame = not _traceback_originals[name].__code__.co_flags & 0x20  # CO_GENERATOR
+
+    def stub(*args: Any, **kwargs: Any) -> Any:
+        if takes_frame:
+            if args:
+                if args[0] is None:
+                    args = (sys._getframe(1), *args[1:])
+            elif kwargs.get("f") is None:
+                kwargs["f"] = sys._getframe(1)
+
+        _load()
+
+        function = getattr(sys.modules["traceback"], name)
+        if function is stub:
+            function = _traceback_originals[name]
+
+        return function(*args, **kwargs)
+
+    stub.__name__ = stub.__qualname__ = name
+
+    return stub
+
+
+def _patch_traceback(
+    module: ModuleType,
+    /,
+) -> None:
+    with _lock:
+        if _loaded or _loading:
+            return
+
+        for name in _traceback_names:
+            _traceback_originals[name] = getattr(module, name)
+            _traceback_stubs[name] = stub = _make_traceback_stub(name)
+            setattr(module, name, stub)
+
+
+class _TracebackFinder:
+    """
+    A meta path finder which patches the :mod:`traceback` module as
+    soon as it is first imported.
+    """
+
+    @classmethod
+    def find_spec(
+        cls,
+        fullname: str,
+        path: Sequence[str] | None = None,
+        target: ModuleType | None = None,
+        /,
+    ) -> ModuleSpec | None:
+        if fullname != "traceback":
+            return None
+
+        _remove_finder()
+
+        for finder in sys.meta_path:
+            find_spec = getattr(finder, "find_spec", None)
+            if find_spec is None:
+                continue
+
+            spec = find_spec(fullname, path, target)
+            if spec is not None:
+                break
+        else:
+            return None
+
+        loader = spec.loader
+        exec_module = getattr(loader, "exec_module", None)
+
+        # NOTE: class loaders (e.g. FrozenImporter) are shared between
+        #       modules and cannot be patched per-module. in that case
+        #       only sys.excepthook is trampolined.
+        if exec_module is None or isinstance(loader, type):
+            return spec
+
+        def exec_module_and_patch(module: ModuleType, /) -> None:
+            exec_module(module)
+            _patch_traceback(module)
+
+        loader.exec_module = exec_module_and_patch
+
+        return spec
+
+
+def _remove_finder() -> None:
+    try:
+        sys.meta_path.remove(_TracebackFinder)
+    except ValueError:
+        pass
+
+
+def _load() -> None:
+    global _loaded, _loading
+
+    # NOTE: pretty is imported without holding _lock, as importing
+    #       traceback holds its module lock while _patch_traceback
+    #       takes _lock, so holding _lock while importing could
+    #       deadlock with another thread importing traceback. other
+    #       threads using a trampoline meanwhile use the originals.
+    with _lock:
+        if _loaded or _loading:
+            return
+
+        _loading = True
+
+        _remove_finder()
+
+        # NOTE: the trampolines are removed before initialization so
+        #       that initialization itself uses the originals, and only
+        #       those which have not since been replaced by the user
+        #       are replaced by pretty.
+        user_excepthook = sys.excepthook
+        if user_excepthook is _excepthook_stub:
+            user_excepthook = None
+            sys.excepthook = _excepthook or sys.__excepthook__
+
+        user_unraisablehook = sys.unraisablehook
+        if user_unraisablehook is _unraisablehook_stub:
+            user_unraisablehook = None
+            sys.unraisablehook = _unraisablehook or sys.__unraisablehook__
+
+        user_traceback = dict()
+        traceback = sys.modules.get("traceback")
+        if traceback is not None:
+            for name, stub in _traceback_stubs.items():
+                current = getattr(traceback, name)
+                if current is stub:
+                    setattr(traceback, name, _traceback_originals[name])
+                else:
+                    user_traceback[name] = current
+
+    try:
+        from pretty import _initialize
+
+        _initialize._main_catchall()
+    finally:
+        with _lock:
+            if user_excepthook is not None:
+                sys.excepthook = user_excepthook
+
+            if user_unraisablehook is not None:
+                sys.unraisablehook = user_unraisablehook
+
+            for name, current in user_traceback.items():
+                setattr(traceback, name, current)
+
+            _loading = False
+            _loaded = True
+
+
+def install() -> bool:
+    """
+    Installs trampolines for :data:`sys.excepthook`,
+    :data:`sys.unraisablehook`, and the :mod:`traceback` module which
+    initialize pretty when first used.
+
+    Returns
+    -------
+    :class:`bool`
+        Whether any trampoline was installed.
+    """
+
+    global _excepthook, _unraisablehook
+
+    enable_all = _get_environment_boolean(_environment_root)
+
+    if enable_all is False:
+        return False
+
+    enable_traceback = _get_environment_boolean(_environment_traceback)
+
+    if enable_traceback is None:
+        enable_traceback = enable_all
+
+    if not enable_traceback:
+        return False
+
+    with _lock:
+        if _loaded or _excepthook is not None:
+            return True
+
+        _excepthook = sys.excepthook
+        sys.excepthook = _excepthook_stub
+
+        _unraisablehook = sys.unraisablehook
+        sys.unraisablehook = _unraisablehook_stub
+
+        traceback = sys.modules.get("traceback")
+        if traceback is not None:
+            _patch_traceback(traceback)
+        else:
+            sys.meta_path.insert(0, _TracebackFinder)
+
+    return True
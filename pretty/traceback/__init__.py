@@ -6,10 +6,29 @@ if TYPE_CHECKING:
     from typing_extensions import ParamSpec
 
 import sys
+import threading
 import traceback
 
+from pretty.traceback.asyncio import *
+from pretty.traceback.asyncio import __all__ as _asyncio__all__
+from pretty.traceback.background import *
+from pretty.traceback.background import __all__ as _background__all__
+from pretty.traceback.emergency import *
+from pretty.traceback.emergency import __all__ as _emergency__all__
+from pretty.traceback.filter import *
+from pretty.traceback.filter import __all__ as _filter__all__
 from pretty.traceback.formatter import *
 from pretty.traceback.formatter import __all__ as _formatter__all__
+from pretty.traceback.logging import *
+from pretty.traceback.logging import __all__ as _logging__all__
+from pretty.traceback.output import *
+from pretty.traceback.output import __all__ as _output__all__
+from pretty.traceback.path import *
+from pretty.traceback.path import __all__ as _path__all__
+from pretty.traceback.position import *
+from pretty.traceback.position import __all__ as _position__all__
+from pretty.traceback.source import *
+from pretty.traceback.source import __all__ as _source__all__
 from pretty.utility import MISSING
 
 
@@ -20,6 +39,10 @@ if TYPE_CHECKING:
 
 _formatter = None
 
+# NOTE: the exceptions whose reports are written without a buffer, see
+#       write_report.
+_unbuffered_types = (MemoryError, RecursionError)
+
 
 @overload
 def hook(
@@ -46,6 +69,12 @@ def hook(
     """
     Hooks pretty.traceback into the current Python session.
 
+    This replaces :data:`sys.excepthook`, :data:`threading.excepthook`,
+    and :data:`sys.unraisablehook`. Each report is rendered by the
+    thread it is made on and then written with
+    :func:`~pretty.traceback.write_report`, so reports made by several
+    threads at once are not interleaved.
+
 
     .. tip::
 
@@ -95,16 +124,18 @@ def hook(
 
     _formatter = formatter = cls and cls(*args, **kwargs) or PrettyTracebackFormatter(*args, **kwargs)
 
+    reserve()
+
     traceback.extract_stack = formatter._extract_stack  # type: ignore
     traceback.extract_tb = formatter._extract_tb  # type: ignore
     traceback.format_exc = formatter._format_exc  # type: ignore
-    traceback.format_exception = formatter._format_exception  # type: ignore
-    traceback.format_exception_only = formatter._format_exception_only  # type: ignore
+    traceback.format_exception = formatter._format_exception
+    traceback.format_exception_only = formatter._format_exception_only
     traceback.format_list = formatter._format_list  # type: ignore
     traceback.format_stack = formatter._format_stack  # type: ignore
     traceback.format_tb = formatter._format_tb  # type: ignore
     traceback.print_exc = formatter._print_exc  # type: ignore
-    traceback.print_exception = formatter._print_exception  # type: ignore
+    traceback.print_exception = formatter._print_exception
     traceback.print_last = formatter._print_last  # type: ignore
     traceback.print_list = formatter._print_list  # type: ignore
     traceback.print_stack = formatter._print_stack  # type: ignore
@@ -112,15 +143,60 @@ def hook(
     traceback.walk_stack = formatter._walk_stack  # type: ignore
     traceback.walk_tb = formatter._walk_tb  # type: ignore
 
-    def excepthook(*args):
-        formatter.print_traceback(*args)
+    # NOTE: reports are rendered by the thread which raised, and only
+    #       written one at a time, so threads crashing at once neither
+    #       interleave their reports nor wait on each other's rendering.
+    def excepthook(type, value, traceback):
+        write_report(lambda stream: formatter.write_traceback(type, value, traceback, stream=stream), stream=sys.stderr, buffered=not isinstance(value, _unbuffered_types))
+
+    def threading_excepthook(args):
+        if args.exc_type is SystemExit or sys.stderr is None:
+            return
+
+        name = args.thread.name if args.thread is not None else threading.get_ident()
+
+        def render(stream):
+            stream.write(f"Exception in thread {name}:\n")
+            formatter.write_traceback(args.exc_type, args.exc_value, args.exc_traceback, stream=stream)
+
+        write_report(render, stream=sys.stderr, buffered=not isinstance(args.exc_value, _unbuffered_types))
+
+    def unraisablehook(unraisable):
+        if sys.stderr is None:
+            return
+
+        def render(stream):
+            if unraisable.object is not None:
+                try:
+                    obj = repr(unraisable.object)
+                except Exception:
+                    obj = "<object repr() failed>"
+
+                stream.write(f"{unraisable.err_msg or 'Exception ignored in'}: {obj}\n")
+            elif unraisable.err_msg:
+                stream.write(f"{unraisable.err_msg}:\n")
+
+            formatter.write_traceback(unraisable.exc_type, unraisable.exc_value, unraisable.exc_traceback, stream=stream)
+
+        write_report(render, stream=sys.stderr, buffered=not isinstance(unraisable.exc_value, _unbuffered_types))
 
     sys.excepthook = excepthook
+    sys.unraisablehook = unraisablehook
+    threading.excepthook = threading_excepthook
 
     return formatter
 
 
 __all__ = [  # pyright: ignore[reportUnsupportedDunderAll]
+    *_asyncio__all__,
+    *_background__all__,
+    *_emergency__all__,
+    *_filter__all__,
     *_formatter__all__,
+    *_logging__all__,
+    *_output__all__,
+    *_path__all__,
+    *_position__all__,
+    *_source__all__,
     "hook",
 ]
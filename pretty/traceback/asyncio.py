@@ -0,0 +1,162 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from asyncio import AbstractEventLoop
+    from typing import Any, TextIO
+    from typing_extensions import Self
+
+import traceback
+
+from pretty.traceback.background import BackgroundWriter
+from pretty.traceback.formatter import DefaultTracebackFormatter, TracebackFormatter
+from pretty.utility import MISSING
+
+
+class EventLoopExceptionHandler:
+    """
+    An :mod:`asyncio` event loop exception handler which renders and
+    writes reports on a worker thread.
+
+    Reports of unhandled exceptions in an event loop, e.g. of tasks
+    whose exception was never retrieved or of failing callbacks, are
+    otherwise written synchronously by
+    :meth:`~asyncio.loop.default_exception_handler`, stalling every
+    other task on the loop. This handler only represents the context
+    of a report on the loop's thread, which is cheap, and submits it
+    to a :class:`~pretty.traceback.BackgroundWriter`, which renders and
+    writes it on a worker thread. When the writer's queue is full,
+    reports are dropped rather than stall the loop.
+
+    Use :func:`hook_event_loop` to install a handler on an event loop.
+
+    Parameters
+    ----------
+    formatter: :class:`~pretty.traceback.TracebackFormatter`
+        The formatter to render tracebacks with. Defaults to the
+        formatter installed by :func:`~pretty.traceback.hook`, or a
+        :class:`~pretty.traceback.PrettyTracebackFormatter` when there
+        is none.
+    stream: :func:`TextIO <open>`
+        The stream to write to. Defaults to :data:`~sys.stderr`, as it
+        is when a report is written.
+
+    Attributes
+    ----------
+    writer: :class:`~pretty.traceback.BackgroundWriter`
+        The writer reports are submitted to.
+    """
+
+    __slots__ = ("writer",)
+
+    def __init__(
+        self: Self,
+        formatter: TracebackFormatter = MISSING,
+        /,
+        *,
+        stream: TextIO = MISSING,
+    ) -> None:
+        self.writer = BackgroundWriter(formatter, overflow="drop_new", stream=stream)
+
+    def __call__(
+        self: Self,
+        loop: AbstractEventLoop,
+        context: dict[str, Any],
+        /,
+    ) -> None:
+        try:
+            # NOTE: the context is represented here, as its objects,
+            #       e.g. tasks and futures, keep changing on the loop.
+            message = self._represent_context(context)
+            exception = context.get("exception")
+
+            if exception is not None:
+                self.writer.submit(exception.__class__, exception, exception.__traceback__, header=message)
+            else:
+                self.writer.submit(None, None, None, header=message)
+        except Exception:
+            loop.default_exception_handler(context)
+
+    def join(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Waits for pending reports to be written.
+        """
+
+        self.writer.join()
+
+    def _represent_context(
+        self: Self,
+        context: dict[str, Any],
+        /,
+    ) -> str:
+        # NOTE: this follows asyncio's default_exception_handler.
+        lines = [context.get("message") or "Unhandled exception in event loop"]
+
+        formatter = self.writer.formatter
+
+        if isinstance(formatter, DefaultTracebackFormatter):
+            represent = formatter.representer.represent
+        else:
+            represent = repr
+
+        for key in sorted(context):
+            if key in ("exception", "message"):
+                continue
+
+            value = context[key]
+
+            if key == "source_traceback":
+                value = "Object created at (most recent call last):\n" + "".join(traceback.format_list(value)).rstrip()
+            elif key == "handle_traceback":
+                value = "Handle created at (most recent call last):\n" + "".join(traceback.format_list(value)).rstrip()
+            else:
+                value = represent(value)
+
+            lines.append(f"{key}: {value}")
+
+        return "\n".join(lines) + "\n"
+
+
+def hook_event_loop(
+    loop: AbstractEventLoop = MISSING,
+    /,
+    *,
+    formatter: TracebackFormatter = MISSING,
+    stream: TextIO = MISSING,
+) -> EventLoopExceptionHandler:
+    """
+    Installs an :class:`EventLoopExceptionHandler` on an event loop.
+
+    Parameters
+    ----------
+    loop: :class:`~asyncio.AbstractEventLoop`
+        The event loop. Defaults to the running event loop.
+    formatter: :class:`~pretty.traceback.TracebackFormatter`
+        The formatter to render tracebacks with.
+    stream: :func:`TextIO <open>`
+        The stream to write to.
+
+
+    :rtype: :class:`EventLoopExceptionHandler`
+    """
+
+    # NOTE: asyncio, and through it ssl, is only imported here, as
+    #       pretty.traceback is imported by every process on its first
+    #       exception.
+    import asyncio
+
+    loop = loop or asyncio.get_running_loop()
+    handler = EventLoopExceptionHandler(formatter, stream=stream)
+
+    loop.set_exception_handler(handler)
+
+    return handler
+
+
+__all__ = [
+    "EventLoopExceptionHandler",
+    "hook_event_loop",
+]
@@ -0,0 +1,431 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logging import LogRecord
+    from types import TracebackType
+    from typing import Literal, TextIO
+    from typing_extensions import Self, TypeAlias
+
+    from pretty.traceback.formatter import _Snapshot
+
+    _Overflow: TypeAlias = "Literal['block', 'drop_new', 'drop_old']"
+
+import atexit
+import copy
+import logging
+import os
+import queue
+import sys
+import threading
+import time
+import weakref
+
+import pretty
+from pretty.traceback.formatter import PrettyTracebackFormatter, TracebackFormatter
+from pretty.traceback.output import write_report
+from pretty.utility import MISSING
+
+
+_overflows = frozenset(["block", "drop_new", "drop_old"])
+
+
+class BackgroundWriter:
+    """
+    A bounded queue of tracebacks which are rendered and written by a
+    worker thread.
+
+    Submitting a traceback only captures a snapshot of it on the
+    calling thread: the traceback itself, whose frames' code and
+    instruction offsets do not change, the messages, notes, chained
+    exceptions, and tracebacks of the exceptions displayed, which may,
+    and, when locals are displayed, the locals of its frames, which
+    do. Locals are copied, or, when ``represent_locals`` is set,
+    represented. Looking up source,
+    rendering, and writing are left to a worker thread, started when
+    the first traceback is submitted. Reports are written in the order
+    they are submitted, each with
+    :func:`~pretty.traceback.write_report`, and reports still pending
+    when the interpreter exits are written before it does. In a child
+    process created with :func:`os.fork`, reports still pending in the
+    parent are dropped.
+
+    When the queue is full, a submitted report is handled according to
+    ``overflow``, which is one of the following:
+
+    - ``"drop_new"``, dropping the submitted report.
+    - ``"drop_old"``, dropping the oldest pending report.
+    - ``"block"``, waiting until there is room in the queue.
+
+    Parameters
+    ----------
+    formatter: :class:`~pretty.traceback.TracebackFormatter`
+        The formatter to render tracebacks with. Defaults to the
+        formatter installed by :func:`~pretty.traceback.hook`, or a
+        :class:`~pretty.traceback.PrettyTracebackFormatter` when there
+        is none.
+    max_size: :class:`int`
+        The maximum number of pending reports.
+    overflow: :class:`str`
+        How a report submitted while the queue is full is handled.
+    represent_locals: :class:`bool`
+        Whether to represent the locals of frames when a traceback is
+        submitted, rather than copy them and represent them when it is
+        rendered. Only applies to tracebacks submitted with
+        ``display_locals``.
+    stream: :func:`TextIO <open>`
+        The stream to write to. Defaults to :data:`~sys.stderr`, as it
+        is when a report is written.
+
+    Attributes
+    ----------
+    formatter: :class:`~pretty.traceback.TracebackFormatter`
+        The formatter to render tracebacks with.
+    max_size: :class:`int`
+        The maximum number of pending reports.
+    overflow: :class:`str`
+        How a report submitted while the queue is full is handled.
+    represent_locals: :class:`bool`
+        Whether to represent the locals of frames when a traceback is
+        submitted.
+    stream: Optional[:func:`TextIO <open>`]
+        The stream to write to, or ``None`` for :data:`~sys.stderr`.
+    """
+
+    __slots__ = ("__weakref__", "_dropped", "_lock", "_queue", "_thread", "formatter", "max_size", "overflow", "represent_locals", "stream")
+
+    def __init__(
+        self: Self,
+        formatter: TracebackFormatter = MISSING,
+        /,
+        *,
+        max_size: int = 1024,
+        overflow: _Overflow = "drop_new",
+        represent_locals: bool = False,
+        stream: TextIO = MISSING,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+
+        if overflow not in _overflows:
+            raise ValueError(f"overflow must be one of {', '.join(map(repr, sorted(_overflows)))}, not {overflow!r}")
+
+        if formatter is MISSING:
+            formatter = pretty.traceback._formatter or PrettyTracebackFormatter()
+
+        self._dropped = 0
+        self._lock = threading.Lock()
+        self._queue: queue.Queue[tuple[str | None, _Snapshot | None]] = queue.Queue(max_size)
+        self._thread: threading.Thread | None = None
+
+        self.formatter = formatter
+        self.max_size = max_size
+        self.overflow = overflow
+        self.represent_locals = represent_locals
+        self.stream = stream or None
+
+        _writers.add(self)
+
+    @property
+    def dropped(
+        self: Self,
+        /,
+    ) -> int:
+        """
+        The number of reports dropped because the queue was full.
+
+        :type: :class:`int`
+        """
+
+        return self._dropped
+
+    @property
+    def pending(
+        self: Self,
+        /,
+    ) -> int:
+        """
+        The approximate number of reports waiting to be written.
+
+        :type: :class:`int`
+        """
+
+        return self._queue.qsize()
+
+    def join(
+        self: Self,
+        /,
+        *,
+        timeout: float | None = None,
+    ) -> bool:
+        """
+        Waits for pending reports, including those submitted while
+        waiting, to be written.
+
+        Called on the worker thread, e.g. by a handler flushed while a
+        report is written, this returns immediately.
+
+        Parameters
+        ----------
+        timeout: Optional[:class:`float`]
+            The maximum time, in seconds, to wait. When ``None``, waits
+            until every pending report is written, or until the worker
+            thread is no longer alive.
+
+
+        Returns
+        -------
+        :class:`bool`
+            Whether every pending report was written.
+        """
+
+        # NOTE: the worker is never stopped, so a report submitted while
+        #       waiting can never be left to a worker which is about to
+        #       exit, or start a second one.
+        if self._thread is threading.current_thread():
+            return False
+
+        deadline = None if timeout is None else time.monotonic() + timeout
+        condition = self._queue.all_tasks_done
+
+        # NOTE: the worker is checked on periodically, as a worker which
+        #       is no longer alive, e.g. at interpreter shutdown, would
+        #       leave Queue.join waiting forever.
+        with condition:
+            while self._queue.unfinished_tasks:
+                thread = self._thread
+
+                if thread is None or not thread.is_alive():
+                    return False
+
+                wait = 0.1 if deadline is None else min(0.1, deadline - time.monotonic())
+
+                if wait <= 0:
+                    return False
+
+                condition.wait(wait)
+
+        return True
+
+    def submit(
+        self: Self,
+        type: type[BaseException] | type[None] | None,
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        chain: bool = MISSING,
+        display_locals: bool = MISSING,
+        header: str | None = None,
+        limit: int = MISSING,
+    ) -> bool:
+        """
+        Submits a traceback to be rendered and written.
+
+        Parameters
+        ----------
+        type: Optional[Type[:class:`BaseException`]]
+            An exception type.
+        value: Optional[:class:`BaseException`]
+            An exception. When ``None``, only ``header`` is written.
+        traceback: :class:`~types.TracebackType`
+            A traceback.
+        chain: :class:`bool`
+            Whether to follow the traceback tree.
+        display_locals: Optional[:class:`bool`]
+            Whether to display the locals in each frame. Defaults to
+            ``None`` when no value is given, but expects a boolean.
+        header: Optional[:class:`str`]
+            The text to write before the traceback, e.g. a log message.
+        limit: :class:`int`
+            The maximum number of frames to extract. When negative,
+            the last ``-limit`` frames are extracted instead.
+
+
+        Returns
+        -------
+        :class:`bool`
+            Whether the report was queued, rather than dropped.
+        """
+
+        if value is not None:
+            snapshot = self.formatter._take_snapshot(
+                value.__class__ if type is None else type, value, traceback, chain=chain, display_locals=display_locals, limit=limit, represent_locals=self.represent_locals
+            )
+        else:
+            snapshot = None
+
+        self._start()
+
+        return self._put((header, snapshot))
+
+    def _put(
+        self: Self,
+        item: tuple[str | None, _Snapshot | None],
+        /,
+    ) -> bool:
+        if self.overflow == "block":
+            self._queue.put(item)
+            return True
+
+        while True:
+            try:
+                self._queue.put_nowait(item)
+            except queue.Full:
+                pass
+            else:
+                return True
+
+            if self.overflow == "drop_new":
+                with self._lock:
+                    self._dropped += 1
+
+                return False
+
+            # NOTE: the worker may take the oldest report first, in
+            #       which case there is room to try again.
+            try:
+                self._queue.get_nowait()
+            except queue.Empty:
+                continue
+
+            self._queue.task_done()
+
+            with self._lock:
+                self._dropped += 1
+
+    def _run(
+        self: Self,
+        /,
+    ) -> None:
+        while True:
+            header, snapshot = self._queue.get()
+
+            def render(stream: TextIO) -> None:
+                if header:
+                    stream.write(header if header.endswith("\n") else header + "\n")
+
+                if snapshot is not None:
+                    self.formatter._write_snapshot(snapshot, stream=stream)
+
+            try:
+                write_report(render, stream=self.stream or sys.stderr, buffered=snapshot is None or not isinstance(snapshot.value, (MemoryError, RecursionError)))
+            except BaseException:
+                # NOTE: a failing report must not stop the reports
+                #       after it from being written, even when it fails
+                #       with e.g. SystemExit, which would otherwise end
+                #       the worker thread.
+                pass
+            finally:
+                self._queue.task_done()
+
+    def _start(
+        self: Self,
+        /,
+    ) -> None:
+        thread = self._thread
+
+        if thread is not None and thread.is_alive():
+            return
+
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name="pretty.traceback.background", daemon=True)
+                self._thread.start()
+
+                # NOTE: registered once, however often the worker
+                #       thread is started again.
+                atexit.unregister(self.join)
+                atexit.register(self.join)
+
+
+class BackgroundTracebackHandler(logging.Handler):
+    """
+    A :class:`logging.Handler` which writes records with a
+    :class:`BackgroundWriter`.
+
+    A record's message is formatted on the calling thread, without its
+    exception, which is instead submitted to the writer along with the
+    message. Formatting and writing the exception's traceback is thus
+    left to the writer's worker thread.
+
+    Parameters
+    ----------
+    writer: :class:`BackgroundWriter`
+        The writer to submit records to. Defaults to a new
+        :class:`BackgroundWriter`.
+    display_locals: Optional[:class:`bool`]
+        Whether to display the locals in each frame.
+    level: Union[:class:`int`, :class:`str`]
+        The level of the handler.
+
+    Attributes
+    ----------
+    display_locals: Optional[:class:`bool`]
+        Whether to display the locals in each frame.
+    writer: :class:`BackgroundWriter`
+        The writer to submit records to.
+    """
+
+    def __init__(
+        self: Self,
+        writer: BackgroundWriter = MISSING,
+        /,
+        *,
+        display_locals: bool | None = None,
+        level: int | str = logging.NOTSET,
+    ) -> None:
+        super().__init__(level)
+
+        self.display_locals = display_locals
+        self.writer = writer or BackgroundWriter()
+
+    def emit(
+        self: Self,
+        record: LogRecord,
+        /,
+    ) -> None:
+        try:
+            exc_info = record.exc_info
+
+            if exc_info and exc_info[1] is not None:
+                # NOTE: the record is shared with other handlers, so a
+                #       copy of it is formatted without its exception.
+                record = copy.copy(record)
+                record.exc_info = None
+                record.exc_text = None
+
+                self.writer.submit(*exc_info, display_locals=self.display_locals, header=self.format(record))  # type: ignore  # None is passed on as is
+            else:
+                self.writer.submit(None, None, None, header=self.format(record))
+        except Exception:
+            self.handleError(record)
+
+    def flush(
+        self: Self,
+        /,
+    ) -> None:
+        self.writer.join()
+
+
+_writers: weakref.WeakSet[BackgroundWriter] = weakref.WeakSet()
+
+
+def _reset_writers() -> None:
+    # NOTE: worker threads do not survive a fork, so the child starts
+    #       its own, and drops the reports pending in the parent rather
+    #       than write them twice.
+    for writer in _writers:
+        writer._lock = threading.Lock()
+        writer._queue = queue.Queue(writer.max_size)
+        writer._thread = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_writers)
+
+
+__all__ = [
+    "BackgroundWriter",
+    "BackgroundTracebackHandler",
+]
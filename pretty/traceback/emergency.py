@@ -0,0 +1,298 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import TextIO
+    from typing_extensions import Self
+
+    from types import TracebackType
+
+import contextlib
+import os
+import sys
+import threading
+
+
+_lock = threading.Lock()
+
+# NOTE: the recursion limit is process-wide, while headroom may be taken
+#       by several threads at once, so only the first to take it raises
+#       the limit and only the last to give it back restores it.
+_recursion_lock = threading.Lock()
+_recursion_depth = 0
+_recursion_limit = 0
+
+_headroom = 0
+_nbytes = 0
+_reserve: bytearray | None = None
+_scratch: bytearray | None = None
+
+_header = b"Traceback (most recent call last):\n"
+_location_start = b'  File "'
+_location_lineno = b'", line '
+_location_name = b", in "
+_newline = b"\n"
+_recursion_start = b"  [Previous line repeated "
+_recursion_end = b" more time]\n"
+_recursion_end_s = b" more times]\n"
+_separator = b": "
+
+
+def reserve(
+    *,
+    nbytes: int = 256 * 1024,
+    scratch_size: int = 4 * 1024,
+    headroom: int = 100,
+) -> None:
+    """
+    Reserves the resources used by :func:`write_emergency_traceback`.
+
+    This function is called by :func:`~pretty.traceback.hook`.
+
+    Parameters
+    ----------
+    nbytes: :class:`int`
+        The number of bytes of memory to reserve, which are released
+        when an emergency traceback is written for a
+        :class:`MemoryError`.
+    scratch_size: :class:`int`
+        The size of the buffer lines are written into, in bytes.
+    headroom: :class:`int`
+        The number of frames the recursion limit is temporarily raised
+        by while an emergency traceback is written.
+    """
+
+    global _headroom, _nbytes, _reserve, _scratch
+
+    if nbytes < 0:
+        raise ValueError("nbytes must be a non-negative integer")
+
+    if scratch_size < 256:
+        raise ValueError("scratch_size must be an integer of at least 256")
+
+    if headroom < 0:
+        raise ValueError("headroom must be a non-negative integer")
+
+    with _lock:
+        _headroom = headroom
+        _nbytes = nbytes
+        _reserve = bytearray(nbytes)
+        _scratch = bytearray(scratch_size)
+
+
+def write_emergency_traceback(
+    type: type[BaseException] | type[None],
+    value: BaseException | None,
+    traceback: TracebackType | None,
+    /,
+    *,
+    stream: TextIO,
+) -> None:
+    """
+    Writes a traceback to a stream with as few resources as possible.
+
+    This function is used in place of
+    :meth:`~pretty.traceback.TracebackFormatter.write_traceback` for
+    :class:`MemoryError`, and for :class:`RecursionError` when
+    formatting the traceback as usual fails for the same reason. It
+    releases the memory reserved by :func:`reserve`, temporarily raises
+    the recursion limit, and writes each frame's location directly to
+    the stream's file descriptor. Source lines, locals, chained
+    exceptions, and styling are not displayed, and repeated lines are
+    collapsed.
+
+    Parameters
+    ----------
+    type: Type[:class:`BaseException`]
+        An exception type.
+    value: :class:`BaseException`
+        An exception.
+    traceback: :class:`~types.TracebackType`
+        A traceback.
+    stream: :func:`TextIO <open>`
+        The stream to write to.
+    """
+
+    global _reserve
+
+    with _lock:
+        # NOTE: releasing the reserve first gives the rest of this
+        #       function, and the interpreter, memory to work with.
+        _reserve = None
+
+        try:
+            with _recursion_headroom():
+                _Writer(stream).write_traceback(type, value, traceback)
+        finally:
+            try:
+                _reserve = bytearray(_nbytes)
+            except MemoryError:
+                pass
+
+
+@contextlib.contextmanager
+def _recursion_headroom() -> Iterator[None]:
+    global _recursion_depth, _recursion_limit
+
+    with _recursion_lock:
+        if not _recursion_depth:
+            _recursion_limit = sys.getrecursionlimit()
+
+            try:
+                sys.setrecursionlimit(_recursion_limit + _headroom)
+            except RecursionError:
+                pass
+
+        _recursion_depth += 1
+
+    try:
+        yield
+    finally:
+        with _recursion_lock:
+            _recursion_depth -= 1
+
+            if not _recursion_depth:
+                try:
+                    sys.setrecursionlimit(_recursion_limit)
+                except RecursionError:
+                    pass
+
+
+class _Writer:
+    __slots__ = ("encoding", "fd", "position", "scratch", "stream")
+
+    def __init__(
+        self: Self,
+        stream: TextIO,
+        /,
+    ) -> None:
+        self.encoding = getattr(stream, "encoding", None) or "utf-8"
+        self.position = 0
+        self.scratch = _scratch if _scratch is not None else bytearray(4 * 1024)
+        self.stream = stream
+
+        try:
+            self.fd: int | None = stream.fileno()
+        except Exception:
+            self.fd = None
+        else:
+            # NOTE: anything already buffered by the stream is written
+            #       first, to keep the output in order.
+            try:
+                stream.flush()
+            except Exception:
+                pass
+
+    def add(
+        self: Self,
+        data: bytes,
+        /,
+    ) -> None:
+        scratch = self.scratch
+
+        if self.position + len(data) > len(scratch):
+            self.flush()
+
+            if len(data) > len(scratch):
+                data = data[: len(scratch) - 4] + b"...\n"
+
+        scratch[self.position : self.position + len(data)] = data
+        self.position += len(data)
+
+    def add_str(
+        self: Self,
+        string: str,
+        /,
+    ) -> None:
+        self.add(string.encode(self.encoding, "backslashreplace"))
+
+    def flush(
+        self: Self,
+        /,
+    ) -> None:
+        view = memoryview(self.scratch)[: self.position]
+
+        try:
+            if self.fd is not None:
+                while view:
+                    view = view[os.write(self.fd, view) :]
+            else:
+                self.stream.write(bytes(view).decode(self.encoding, "replace"))
+        finally:
+            view.release()
+            self.position = 0
+
+    def write_traceback(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+    ) -> None:
+        if traceback is not None:
+            self.add(_header)
+
+        last_code = None
+        last_lineno = -1
+        times = 0
+
+        while traceback is not None:
+            code = traceback.tb_frame.f_code
+            lineno = traceback.tb_lineno
+            traceback = traceback.tb_next
+
+            if code is last_code and lineno == last_lineno:
+                times += 1
+
+                if times >= 3:
+                    continue
+            else:
+                self.write_recursion(times - 2)
+
+                last_code = code
+                last_lineno = lineno
+                times = 0
+
+            self.add(_location_start)
+            self.add_str(code.co_filename)
+            self.add(_location_lineno)
+            self.add(b"%d" % lineno if lineno is not None else b"?")
+            self.add(_location_name)
+            self.add_str(code.co_name)
+            self.add(_newline)
+
+        self.write_recursion(times - 2)
+
+        try:
+            self.add_str(type.__name__)
+        except Exception:
+            self.add(b"<type.__name__ failed>")
+
+        try:
+            message = str(value)
+        except Exception:
+            message = "<value.__str__ failed>"
+
+        if message:
+            self.add(_separator)
+            self.add_str(message)
+
+        self.add(_newline)
+        self.flush()
+
+    def write_recursion(
+        self: Self,
+        times: int,
+        /,
+    ) -> None:
+        if times > 0:
+            self.add(_recursion_start)
+            self.add(b"%d" % times)
+            self.add(_recursion_end if times == 1 else _recursion_end_s)
+
+
+__all__ = [
+    "reserve",
+    "write_emergency_traceback",
+]
@@ -0,0 +1,222 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing import Literal
+    from typing_extensions import Self, TypeAlias
+
+    _Action: TypeAlias = "Literal['collapse', 'hide', 'no_locals']"
+
+import fnmatch
+import os
+import re
+import site
+import sysconfig
+import threading
+
+import pretty
+
+
+_actions = frozenset(["collapse", "hide", "no_locals"])
+
+
+def _normalize_path(
+    path: str,
+    /,
+) -> str:
+    return os.path.normcase(os.path.abspath(os.path.expanduser(path)))
+
+
+def _normalize_prefixes(
+    paths: Iterable[str],
+    /,
+) -> tuple[str, ...]:
+    # NOTE: prefixes end with a separator, so "/a/b" does not match
+    #       "/a/bc", and paths are matched with their own separator
+    #       appended, so a prefix may also be a file.
+    return tuple(os.path.join(_normalize_path(path), "") for path in paths)
+
+
+def _get_site_packages_paths() -> list[str]:
+    paths = [sysconfig.get_paths()[name] for name in ("purelib", "platlib")]
+
+    try:
+        paths.extend(site.getsitepackages())
+    except AttributeError:
+        # NOTE: site.getsitepackages is missing in some virtualenvs.
+        pass
+
+    if site.ENABLE_USER_SITE:
+        paths.append(site.getusersitepackages())
+
+    return paths
+
+
+def _get_stdlib_paths() -> list[str]:
+    return [sysconfig.get_paths()[name] for name in ("stdlib", "platstdlib")]
+
+
+class FrameFilter:
+    """
+    A set of rules deciding how frames are displayed by the file and
+    module they belong to, with a bounded, thread-safe cache.
+
+    Each rule is a pair of a pattern and an action. A pattern is one
+    of the following:
+
+    - ``"stdlib"``, matching files of the standard library, excluding
+      site-packages, and frozen modules.
+    - ``"site-packages"``, matching files of installed packages.
+    - ``"module:<glob>"``, matching modules by their name with
+      :mod:`fnmatch`, e.g. ``"module:django.*"``.
+    - Any other string, matching files by a path prefix, e.g.
+      ``"/srv/app/vendor"`` or ``"~/.local"``.
+
+    An action is one of the following:
+
+    - ``"hide"``, hiding matching frames.
+    - ``"collapse"``, replacing runs of consecutive matching frames
+      with a single message.
+    - ``"no_locals"``, displaying matching frames without their
+      locals.
+
+    The first rule which matches a frame decides its action. Rules are
+    compiled once, and the action of each file is cached, so deciding
+    the action of a frame costs a single lookup.
+
+    Parameters
+    ----------
+    rules: Iterable[Tuple[:class:`str`, :class:`str`]]
+        The rules, in order of precedence.
+    max_size: :class:`int`
+        The maximum number of files to cache the actions of.
+
+    Attributes
+    ----------
+    max_size: :class:`int`
+        The maximum number of files to cache the actions of.
+    """
+
+    __slots__ = ("_actions", "_lock", "_rules", "_site_packages", "max_size")
+
+    def __init__(
+        self: Self,
+        rules: Iterable[tuple[str, str]],
+        /,
+        *,
+        max_size: int = 1024,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+
+        self._rules: list[tuple[str, tuple[str, ...] | re.Pattern[str], _Action]] = []
+        self._site_packages = _normalize_prefixes(_get_site_packages_paths())
+
+        for pattern, action in rules:
+            if action not in _actions:
+                raise ValueError(f"action must be one of {', '.join(map(repr, sorted(_actions)))}, not {action!r}")
+
+            if pattern == "stdlib":
+                self._rules.append(("stdlib", _normalize_prefixes(_get_stdlib_paths()), action))  # type: ignore  # checked above
+            elif pattern == "site-packages":
+                self._rules.append(("path", self._site_packages, action))  # type: ignore  # checked above
+            elif pattern.startswith("module:"):
+                self._rules.append(("module", re.compile(fnmatch.translate(pattern[7:])), action))  # type: ignore  # checked above
+            else:
+                self._rules.append(("path", _normalize_prefixes([pattern]), action))  # type: ignore  # checked above
+
+        self._actions: pretty.utility.LRUCache[tuple[str, str | None], _Action | None] = pretty.utility.LRUCache(max_size=max_size)
+        self._lock = threading.Lock()
+
+        self.max_size = max_size
+
+    def __len__(
+        self: Self,
+        /,
+    ) -> int:
+        return len(self._actions)
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        with self._lock:
+            self._actions.clear()
+
+    def get_action(
+        self: Self,
+        filename: str,
+        module: str | None = None,
+        /,
+    ) -> _Action | None:
+        """
+        Gets the action of a frame.
+
+        Parameters
+        ----------
+        filename: :class:`str`
+            The name of the frame's source file, as in
+            :attr:`code.co_filename <types.CodeType.co_filename>`.
+        module: Optional[:class:`str`]
+            The name of the frame's module, as in ``__name__``.
+
+
+        Returns
+        -------
+        Optional[:class:`str`]
+            The action of the first rule which matches the frame, or
+            ``None`` when no rule does.
+        """
+
+        key = (filename, module)
+
+        with self._lock:
+            try:
+                return self._actions[key]
+            except KeyError:
+                pass
+
+        # NOTE: found outside of the lock, at worst twice.
+        action = self._find_action(filename, module)
+
+        with self._lock:
+            self._actions[key] = action
+
+        return action
+
+    def _find_action(
+        self: Self,
+        filename: str,
+        module: str | None,
+        /,
+    ) -> _Action | None:
+        if filename.startswith("<") and filename.endswith(">"):
+            path = None
+        else:
+            path = os.path.join(_normalize_path(filename), "")
+
+        for kind, data, action in self._rules:
+            if kind == "module":
+                if module is not None and data.fullmatch(module):  # type: ignore  # compiled for modules
+                    return action
+            elif kind == "stdlib" and filename.startswith("<frozen "):
+                return action
+            elif path is not None and path.startswith(data):  # type: ignore  # prefixes for paths
+                # NOTE: site-packages may be inside of the standard
+                #       library, e.g. in a system-wide installation.
+                if kind == "stdlib" and path.startswith(self._site_packages):
+                    continue
+
+                return action
+
+        return None
+
+
+__all__ = [
+    "FrameFilter",
+]
@@ -3,22 +3,195 @@ from typing import TYPE_CHECKING
 
 if TYPE_CHECKING:
     from collections.abc import Iterable, Iterator
-    from typing import Any, TextIO, cast, overload
-    from typing_extensions import Self
+    from typing import Any, TextIO, TypeVar, cast, overload
+    from typing_extensions import Self, TypeAlias
 
     from traceback import FrameSummary, StackSummary
     from types import FrameType, TracebackType
+    import sys
+
+    from pretty.traceback.path import PathCache
+
+    # NOTE: exception groups only exist in Python 3.11 and higher.
+    if sys.version_info >= (3, 11):
+        _ExceptionGroup: TypeAlias = "BaseExceptionGroup[BaseException]"
+    else:
+        _ExceptionGroup: TypeAlias = "Any"
+
+    _K = TypeVar("_K")
+    _Segment: TypeAlias = "tuple[str, str | None, str]"
 
 import abc
+import collections
 import itertools
-import linecache
+import os
+import re
 import sys
-import textwrap
+import time
 import traceback
 import types
 
 import pretty
+from pretty.traceback.emergency import _recursion_headroom, write_emergency_traceback
+from pretty.traceback.filter import FrameFilter
+from pretty.traceback.position import PositionCache
+from pretty.traceback.source import SourceCache
 from pretty.utility import MISSING
+from pretty.utility.terminal import wants_ansi_sgr
+
+
+# NOTE: the theme keys of the kinds of spans of source lines, see
+#       SourceCache.get_spans.
+_span_styles = {
+    "bool": "literal_bool_sgr",
+    "bytes": "literal_bytes_sgr",
+    "comment": "ast_comment_sgr",
+    "complex": "literal_complex_sgr",
+    "delimiter": "ast_delimiter_sgr",
+    "ellipsis": "literal_ellipsis_sgr",
+    "float": "literal_float_sgr",
+    "int": "literal_int_sgr",
+    "keyword": "ast_keyword_sgr",
+    "name": "ast_name_sgr",
+    "none": "literal_none_sgr",
+    "operator": "ast_operator_sgr",
+    "str": "literal_str_sgr",
+}
+
+# NOTE: the theme keys of the types of literals in representations, see
+#       Representer.represent.
+_literal_styles = {
+    bool: "literal_bool_sgr",
+    bytes: "literal_bytes_sgr",
+    complex: "literal_complex_sgr",
+    float: "literal_float_sgr",
+    int: "literal_int_sgr",
+    str: "literal_str_sgr",
+    type(None): "literal_none_sgr",
+    type(Ellipsis): "literal_ellipsis_sgr",
+}
+
+_sgr_pattern = re.compile("\x1B\\[[0-9;]*m")
+
+# NOTE: instances of these types are cheap to represent and often
+#       share an identity by coincidence, so they are not memoized.
+_scalar_types = frozenset([bool, bytes, complex, float, int, str, type(None), type(Ellipsis)])
+
+
+def _compile_sgr(
+    theme: dict[str, Any],
+    styles: dict[_K, str],
+    /,
+) -> dict[_K, tuple[str, str]]:
+    # NOTE: looks up the SGR start and end sequences of each style once,
+    #       rather than once per piece of text styled with it.
+    sgr: dict[_K, tuple[str, str]] = dict()
+
+    for key, style in styles.items():
+        value = theme.get(style)
+
+        if not value:
+            continue
+
+        if isinstance(value, str):
+            sgr[key] = (f"\x1B[{value}m", "\x1B[0m")
+        else:
+            sgr[key] = (f"\x1B[{value[0]}m", f"\x1B[{value[1]}m")
+
+    return sgr
+
+
+class _Context:
+    # NOTE: the state of a single render, shared by the _segment_*
+    #       methods of a formatter.
+    __slots__ = ("deadline", "frames", "literal_sgr", "reprs", "snapshot_exceptions", "snapshot_locals", "snapshot_represented", "source_sgr", "span_sgr", "theme")
+
+    def __init__(
+        self: Self,
+        deadline: float | None,
+        theme: dict[str, Any] | None,
+        /,
+    ) -> None:
+        self.deadline = deadline
+        self.frames = 0
+        self.reprs: dict[int, tuple[Any, str, int, str]] = dict()
+        # NOTE: the state of exceptions captured in advance, by id,
+        #       which is displayed in place of their current state.
+        self.snapshot_exceptions: dict[int, _ExceptionState] | None = None
+        # NOTE: the locals of frames copied or represented in advance,
+        #       which are displayed in place of the frames' current
+        #       locals.
+        self.snapshot_locals: dict[FrameType, dict[str, Any]] | None = None
+        self.snapshot_represented = False
+        # NOTE: the theme the render is styled with, if any. work only
+        #       needed for styling is skipped when this is None.
+        self.theme = theme
+
+        if theme is None:
+            self.literal_sgr: dict[type, tuple[str, str]] | None = None
+            self.source_sgr = ("", "")
+            self.span_sgr: dict[str, tuple[str, str]] = dict()
+        else:
+            self.literal_sgr = _compile_sgr(theme, _literal_styles)
+            self.source_sgr = _compile_sgr(theme, {"": "traceback_source_sgr"}).get("", ("", ""))
+            self.span_sgr = _compile_sgr(theme, _span_styles)
+
+
+class _ExceptionState:
+    # NOTE: the parts of an exception which are displayed, captured
+    #       along with a snapshot. exceptions are mutable, and may be
+    #       raised again, after the snapshot was taken.
+    __slots__ = ("args", "cause", "context", "exception", "message", "notes", "suppress_context", "traceback")
+
+    def __init__(
+        self: Self,
+        exception: BaseException,
+        traceback: TracebackType | None,
+        message: str,
+        notes: list[str] | None,
+        /,
+    ) -> None:
+        self.args = exception.args
+        self.cause = exception.__cause__
+        self.context = exception.__context__
+        self.exception = exception
+        self.message = message
+        self.notes = notes
+        self.suppress_context = exception.__suppress_context__
+        self.traceback = traceback
+
+
+class _Snapshot:
+    # NOTE: a traceback captured to be rendered later, see
+    #       TracebackFormatter._take_snapshot. tracebacks, their frames'
+    #       code, and their instruction offsets do not change, but the
+    #       exceptions and the locals of frames do, so they are captured
+    #       as well, when the formatter supports it.
+    __slots__ = ("chain", "display_locals", "exceptions", "limit", "locals", "represented", "traceback", "type", "value")
+
+    def __init__(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        chain: bool,
+        display_locals: bool,
+        limit: int,
+        exceptions: dict[int, _ExceptionState] | None = None,
+        locals: dict[FrameType, dict[str, Any]] | None = None,
+        represented: bool = False,
+    ) -> None:
+        self.chain = chain
+        self.display_locals = display_locals
+        self.exceptions = exceptions
+        self.limit = limit
+        self.locals = locals
+        self.represented = represented
+        self.traceback = traceback
+        self.type = type
+        self.value = value
 
 
 class TracebackFormatter(metaclass=abc.ABCMeta):
@@ -184,7 +357,8 @@ class TracebackFormatter(metaclass=abc.ABCMeta):
             Whether to display the locals in each frame. Defaults to
             ``None`` when no value is given, but expects a boolean.
         limit: :class:`int`
-            The maximum number of frames to extract.
+            The maximum number of frames to extract. When negative,
+            the last ``-limit`` frames are extracted instead.
 
 
         :yields: :class:`str`
@@ -327,7 +501,8 @@ class TracebackFormatter(metaclass=abc.ABCMeta):
             Whether to display the locals in each frame. Defaults to
             ``None`` when no value is given, but expects a boolean.
         limit: :class:`int`
-            The maximum number of frames to extract.
+            The maximum number of frames to extract. When negative,
+            the last ``-limit`` frames are extracted instead.
         stream: :func:`TextIO <open>`
             The stream to print to. Defaults to :data:`~sys.stderr`.
         """
@@ -355,7 +530,8 @@ class TracebackFormatter(metaclass=abc.ABCMeta):
         obj: Union[:data:`~types.FrameType`, :class:`~types.TracebackType`]
             A frame or traceback.
         limit: :class:`int`
-            The maximum number of frames to extract.
+            The maximum number of frames to extract. When negative,
+            the last ``-limit`` frames are extracted instead.
 
 
         :yields: Tuple[ \
@@ -499,11 +675,37 @@ class TracebackFormatter(metaclass=abc.ABCMeta):
             Whether to display the locals in each frame. Defaults to
             ``None`` when no value is given, but expects a boolean.
         limit: :class:`int`
-            The maximum number of frames to extract.
+            The maximum number of frames to extract. When negative,
+            the last ``-limit`` frames are extracted instead.
         """
 
         stream.write("".join(self.format_traceback(type, value, traceback, chain=chain, display_locals=display_locals, limit=limit)))
 
+    def _take_snapshot(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        chain: bool = MISSING,
+        display_locals: bool = MISSING,
+        limit: int = MISSING,
+        represent_locals: bool = False,
+    ) -> _Snapshot:
+        # NOTE: formatters which cannot represent locals in advance
+        #       ignore represent_locals.
+        return _Snapshot(type, value, traceback, chain=chain, display_locals=display_locals, limit=limit)
+
+    def _write_snapshot(
+        self: Self,
+        snapshot: _Snapshot,
+        /,
+        *,
+        stream: TextIO,
+    ) -> None:
+        self.write_traceback(snapshot.type, snapshot.value, snapshot.traceback, stream=stream, chain=snapshot.chain, display_locals=snapshot.display_locals, limit=snapshot.limit)
+
     @pretty.utility.wrap_fallback(traceback.extract_stack)  # type: ignore  # it doesn't like self
     def _extract_stack(
         self: Self,
@@ -969,26 +1171,148 @@ class DefaultTracebackFormatter(TracebackFormatter):
     ----------
     cause_header: :class:`str`
         The message yielded after an exception's cause.
+    chain_cutoff: :class:`int`
+        The maximum number of chained exceptions to display, of at
+        least two. When a chain is longer, its root exception and the
+        newest ``chain_cutoff - 1`` exceptions are displayed.
+    chain_elision_message_format: :class:`str`
+        The format for the message yielded in place of the chained
+        exceptions between the root exception and the newest ones.
+    collapse_message_format: :class:`str`
+        The format for the message yielded in place of a run of frames
+        collapsed by ``frame_filter``.
+    common_cutoff: Optional[:class:`int`]
+        The number of trailing frames a traceback must share with the
+        traceback of the exception displayed above it before they are
+        elided, e.g. when an exception is raised with
+        :meth:`~BaseException.with_traceback` of the exception it was
+        raised while handling. When ``None``, no frames are elided.
+    common_message_format: :class:`str`
+        The format for the message yielded in place of frames shared
+        with the exception displayed above.
     context_header: :class:`str`
         The message yielded after an exception's context.
+    elision_head_cutoff: Optional[:class:`int`]
+        The number of frames to display at the start of a stack before
+        eliding the rest. When this and ``elision_tail_cutoff`` are
+        both ``None``, no frames are elided.
+    elision_message_format: :class:`str`
+        The format for the message yielded in place of elided frames.
+    elision_tail_cutoff: Optional[:class:`int`]
+        The number of frames to display at the end of a stack after
+        eliding the rest. When this and ``elision_head_cutoff`` are
+        both ``None``, no frames are elided.
+    frame_filter: Optional[:class:`~pretty.traceback.FrameFilter`]
+        The rules used to hide or collapse frames, or to display them
+        without their locals. When ``None``, every frame is displayed.
+    group_depth_cutoff: :class:`int`
+        The maximum depth of nested exception groups to display.
+    group_depth_message_format: :class:`str`
+        The format for the message yielded in place of exception
+        groups nested deeper than ``group_depth_cutoff``.
+    group_header: :class:`str`
+        The message yielded before an exception group's traceback.
+    group_identical_message_format: :class:`str`
+        The format for the message yielded in place of the
+        sub-exceptions of an exception group which are identical to
+        the one displayed, i.e. of the same type and with the same
+        message and traceback.
+    group_scan_cutoff: :class:`int`
+        The maximum number of sub-exceptions of an exception group to
+        examine for identical sub-exceptions.
+    group_width_cutoff: :class:`int`
+        The maximum number of distinct sub-exceptions of an exception
+        group to display.
+    group_width_message_format: :class:`str`
+        The format for the message yielded in place of sub-exceptions
+        beyond ``group_width_cutoff`` or ``group_scan_cutoff``.
+    locals_budget: :class:`int`
+        The maximum total number of characters of the representations
+        of the locals displayed in each frame.
+    locals_message_format: :class:`str`
+        The format for the message yielded in place of locals beyond
+        ``locals_budget``.
+    locals_reference_format: Optional[:class:`str`]
+        The format for the message yielded in place of the
+        representation of a local which has already been displayed in
+        an earlier frame, e.g. ``"<same as frame {frame}: {name}>"``.
+        When ``None``, the representation is displayed again.
+    path_cache: Optional[:class:`~pretty.traceback.PathCache`]
+        The cache used to shorten the filenames displayed in frame
+        locations. When ``None``, filenames are displayed as they are.
+    position_cache: :class:`~pretty.traceback.PositionCache`
+        The cache used to look up instruction positions.
     recursion_cutoff: :class:`int`
-        The number of the same frame to display before instead
-        displaying a recursion message.
+        The number of the same frame, or cycle of frames, to display
+        before instead displaying a recursion message.
+    recursion_cycle_message_format: :class:`str`
+        The format for the message yielded in place of recursive
+        cycles of frames.
     recursion_message_format: :class:`str`
         The format for the message yielded in place of recursive
         frames.
+    recursion_period_cutoff: :class:`int`
+        The maximum number of frames in a cycle to detect recursion
+        across.
+    render_timeout: Optional[:class:`float`]
+        The maximum total time, in seconds, to spend calling the
+        :meth:`~object.__repr__` methods of locals in a single render,
+        after which they are no longer called. When ``None``, only the
+        ``timeout`` of the representer applies.
+    representer: :class:`~pretty.utility.Representer`
+        The representer used to represent exception values, notes,
+        and locals.
+    source_cache: :class:`~pretty.traceback.SourceCache`
+        The cache used to look up source lines.
+    source_cutoff: :class:`int`
+        The maximum number of lines of a statement spanning several
+        lines to display.
+    source_message_format: :class:`str`
+        The format for the message yielded in place of the lines of a
+        statement beyond ``source_cutoff``.
     traceback_header: :class:`str`
         The message yielded before an exception's traceback.
+    write_buffer_size: :class:`int`
+        The number of characters to buffer before writing to a stream.
     """
 
     __slots__ = ()
 
     cause_header = "The above exception was the direct cause of the following exception:"
+    chain_cutoff = 100
+    chain_elision_message_format = "[... {times} more chained exception{times_s} omitted ...]"
+    collapse_message_format = "[... {times} frame{times_s} collapsed ...]"
+    common_cutoff: int | None = 1
+    common_message_format = "[... {times} frame{times_s} in common with the exception above ...]"
     context_header = "During handling of the above exception, another exception occurred:"
+    elision_head_cutoff: int | None = None
+    elision_message_format = "[... {times} frame{times_s} omitted ...]"
+    elision_tail_cutoff: int | None = None
+    frame_filter: FrameFilter | None = None
+    group_depth_cutoff = 10
+    group_depth_message_format = "[... exception groups nested deeper than {depth} omitted ...]"
+    group_header = "Exception Group Traceback (most recent call last):"
+    group_identical_message_format = "[... {times} more identical exception{times_s} omitted ...]"
+    group_scan_cutoff = 1000
+    group_width_cutoff = 15
+    group_width_message_format = "[... {times} more exception{times_s} omitted ...]"
+    locals_budget = 8 * 1024
+    locals_message_format = "[... {times} more local{times_s} omitted ...]"
+    locals_reference_format: str | None = None
     location_format = "File \"{filename}\", line {lineno}, in {name}"  # fmt: skip
+    path_cache: PathCache | None = None
+    position_cache = PositionCache()
     recursion_cutoff = 3
+    recursion_cycle_message_format = "[Previous {frames} frames repeated {times} more time{times_s}]"
     recursion_message_format = "[Previous line repeated {times} more time{times_s}]"
+    recursion_period_cutoff = 8
+    render_timeout: float | None = 2.0
+    representer = pretty.utility.Representer()
+    source_cache = SourceCache()
+    source_cutoff = 8
+    source_message_format = "[... {times} more line{times_s} omitted ...]"
     traceback_header = "Traceback (most recent call last):"
+    write_buffer_size = 8 * 1024
 
     def format_exception(
         self: Self,
@@ -996,21 +1320,98 @@ class DefaultTracebackFormatter(TracebackFormatter):
         value: BaseException | None,
         /,
     ) -> Iterator[str]:
+        yield from self._render(self._segment_exception(type, value, context=self._create_context(), indent=""))
+
+    def _segment_exception(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        /,
+        *,
+        context: _Context,
+        indent: str,
+    ) -> Iterator[_Segment]:
         type_name = pretty.utility.try_name(type, default="<type.__name__ failed>")
-        value_str = pretty.utility.try_str(value, default="<value.__str__ failed>")
+        value_str = self._stringify_exception(value, context=context)
+
+        yield (type_name, "traceback_exception_sgr", indent)
 
         if value_str:
-            yield f"{type_name}: {value_str}\n"
-        else:
-            yield f"{type_name}\n"
+            yield (": ", None, indent)
+            yield (value_str, None, indent)
+
+        yield ("\n", None, indent)
 
         if sys.version_info >= (3, 11):
-            notes = getattr(value, "__notes__", None)
+            state = self._get_exception_state(value, context=context)
+            notes = self._stringify_notes(value) if state is None else state.notes
+
             if notes:
                 for note in notes:
-                    note = pretty.utility.try_str(note, default="<note.__str__ failed>")
                     for line in note.splitlines():
-                        yield f"{line}\n"
+                        yield (line, None, indent)
+                        yield ("\n", None, indent)
+
+    def _stringify_notes(
+        self: Self,
+        value: BaseException | None,
+        /,
+    ) -> list[str] | None:
+        notes = getattr(value, "__notes__", None)
+
+        if not notes:
+            return None
+
+        return [self.representer.stringify(note, name="note") for note in notes]
+
+    def _stringify_exception(
+        self: Self,
+        value: BaseException | None,
+        /,
+        *,
+        context: _Context,
+    ) -> str:
+        literal_sgr = context.literal_sgr
+        state = self._get_exception_state(value, context=context)
+
+        # NOTE: when an exception is converted to a string by its
+        #       arguments' representations, like Exception(1, "a") or
+        #       KeyError("a"), those are styled as literals.
+        if literal_sgr is not None and isinstance(value, BaseException):
+            str_function = value.__class__.__str__
+
+            if str_function is BaseException.__str__ or str_function is KeyError.__str__:
+                args = value.args if state is None else state.args
+
+                # NOTE: these are styled from the representations str()
+                #       is made of, rather than with the representer, so
+                #       that styling never changes what is displayed.
+                if args.__class__ is tuple and all(arg.__class__ in _literal_styles for arg in args):
+                    try:
+                        if len(args) == 1 and (str_function is KeyError.__str__ or args[0].__class__ is not str):
+                            return self._style_literal(args[0], literal_sgr)
+
+                        if len(args) > 1:
+                            return f"({', '.join([self._style_literal(arg, literal_sgr) for arg in args])})"
+                    except Exception:
+                        # NOTE: e.g. an int with too many digits, which
+                        #       str() fails to convert as well.
+                        pass
+
+        if state is not None:
+            return state.message
+
+        return self.representer.stringify(value)
+
+    def _style_literal(
+        self: Self,
+        obj: Any,
+        literal_sgr: dict[type, tuple[str, str]],
+        /,
+    ) -> str:
+        start, end = literal_sgr.get(obj.__class__, ("", ""))
+
+        return f"{start}{obj!r}{end}"
 
     def format_frame(
         self: Self,
@@ -1019,6 +1420,17 @@ class DefaultTracebackFormatter(TracebackFormatter):
         *,
         display_locals: bool | None = None,
     ) -> Iterator[str]:
+        yield from self._render(self._segment_frame(frame, context=self._create_context(), display_locals=display_locals, indent=""))
+
+    def _segment_frame(
+        self: Self,
+        frame: tuple[FrameSummary | FrameType, tuple[int, int | None, int | None, int | None]],
+        /,
+        *,
+        context: _Context,
+        display_locals: bool | None,
+        indent: str,
+    ) -> Iterator[_Segment]:
         frame_summary, frame_position = frame
 
         if TYPE_CHECKING:
@@ -1034,31 +1446,156 @@ class DefaultTracebackFormatter(TracebackFormatter):
 
         lineno = frame_position[0]
 
-        yield self.location_format.format(filename=filename, lineno=lineno, name=name) + "\n"
+        if self.path_cache is not None:
+            display_filename = self.path_cache.get(filename, self._get_path_separator())
+        else:
+            display_filename = filename
+
+        yield (self.location_format.format(filename=display_filename, lineno=lineno, name=name), "traceback_location_sgr", indent)
+        yield ("\n", None, indent)
+
+        end_line = frame_position[1]
 
         if isinstance(frame_summary, types.FrameType):
-            line = linecache.getline(filename, lineno)
+            # NOTE: all lines of a statement spanning several lines are
+            #       displayed, up to source_cutoff, looked up at once.
+            if end_line is not None and end_line > lineno:
+                lines = self.source_cache.get_lines(filename, lineno, min(end_line, lineno + self.source_cutoff - 1), frame_summary.f_globals)
+            else:
+                lines = self.source_cache.get_lines(filename, lineno, lineno, frame_summary.f_globals)
         else:
             line = frame_summary.line
+            lines = [line] if line else []
 
-        if line:
-            yield line
+        for line_offset, line in enumerate(lines):
+            if context.theme is not None and isinstance(frame_summary, types.FrameType):
+                spans = self.source_cache.get_spans(filename, lineno + line_offset)
+            else:
+                spans = ()
+
+            if spans:
+                # NOTE: the line is styled here, rather than yielded as
+                #       a segment per span, as it is the only text which
+                #       is styled in more than a few parts.
+                yield (self._highlight(line, spans, context=context), None, indent)
+                yield ("\n", None, indent)
+            else:
+                yield (line, "traceback_source_sgr", indent)
+
+                if not line.endswith("\n"):
+                    yield ("\n", None, indent)
+
+        if end_line is not None and end_line >= lineno + len(lines) and len(lines) == self.source_cutoff:
+            times = end_line - lineno - len(lines) + 1
+            yield (self.source_message_format.format(times=times, times_s="" if times == 1 else "s"), "traceback_message_sgr", indent)
+            yield ("\n", None, indent)
+
+        # NOTE: carets are only displayed under a single line.
+        if len(lines) == 1 and isinstance(frame_summary, types.FrameType):
+            line = lines[0]
+            carets = self.position_cache.get_carets(frame_summary.f_code, frame_position, line)
+
+            if carets is not None:
+                start, end, anchor_start, anchor_end = carets
+
+                # NOTE: tabs are kept so the carets line up with the line.
+                if line.find("\t", 0, start) == -1:
+                    yield (" " * start, None, indent)
+                else:
+                    yield ("".join(character if character == "\t" else " " for character in line[:start]), None, indent)
+                yield ("~" * (anchor_start - start) + "^" * (anchor_end - anchor_start) + "~" * (end - anchor_end), "traceback_introspection_sgr", indent)
+                yield ("\n", None, indent)
 
         if display_locals is None:
             display_locals = False
+        elif display_locals and self._get_frame_action(frame_summary) == "no_locals":
+            display_locals = False
+
+        context.frames += 1
 
         if display_locals:
-            if isinstance(frame_summary, types.FrameType):
-                locals = frame_summary.f_locals
-            else:
+            # NOTE: locals represented in advance are displayed as
+            #       those of a FrameSummary are, and locals copied in
+            #       advance as those of a frame are.
+            if not isinstance(frame_summary, types.FrameType):
                 locals = frame_summary.locals
+                live = False
+            elif context.snapshot_locals is not None and frame_summary in context.snapshot_locals:
+                locals = context.snapshot_locals[frame_summary]
+                live = not context.snapshot_represented
+            else:
+                locals = frame_summary.f_locals
+                live = True
 
             if locals:
-                for key, value in sorted(locals.items()):
-                    if isinstance(frame_summary, types.FrameType):
-                        value = pretty.utility.try_repr(value, default="<value.__repr__ failed>")
+                # NOTE: the reprs of all locals in a frame share a
+                #       budget, so a frame with many large locals costs
+                #       no more than locals_budget characters.
+                budget = self.locals_budget
+                items = sorted(locals.items())
+                literal_sgr = context.literal_sgr
+                reprs = context.reprs
+                reference_format = self.locals_reference_format
+
+                for i, (key, value) in enumerate(items):
+                    if budget <= 0:
+                        times = len(items) - i
+                        yield ("  ", None, indent)
+                        yield (self.locals_message_format.format(times=times, times_s="" if times == 1 else "s"), "traceback_message_sgr", indent)
+                        yield ("\n", None, indent)
+                        break
+
+                    obj = value
+                    styled = False
+                    style = None
+
+                    if live:
+                        styled = literal_sgr is not None
+
+                        if obj.__class__ in _scalar_types:
+                            value = self.representer.represent(obj, max_chars=budget, deadline=context.deadline, sgr=literal_sgr)
+                        elif id(obj) in reprs:
+                            # NOTE: each object is represented at most
+                            #       once per render.
+                            _, value, frame_number, name = reprs[id(obj)]
+
+                            if reference_format is not None:
+                                value = reference_format.format(frame=frame_number, name=name)
+                                styled = False
+                                style = "traceback_message_sgr"
+                        else:
+                            # NOTE: the memo keeps the object alive, so
+                            #       its id is not reused during the
+                            #       render. it holds the representation
+                            #       within the whole locals_budget,
+                            #       which is cut to the budget left in
+                            #       each frame it is displayed in.
+                            value = self.representer.represent(obj, max_chars=self.locals_budget, deadline=context.deadline, sgr=literal_sgr)
+                            reprs[id(obj)] = (obj, value, context.frames, key)
+
+                    if not styled:
+                        if len(value) > budget:
+                            value = value[:budget] + self.representer.placeholder
+
+                        length = len(value)
+                    else:
+                        # NOTE: SGR sequences do not count towards the
+                        #       budget, and a styled representation is
+                        #       cut without them rather than represented
+                        #       again, which would call __repr__ again.
+                        length = len(_sgr_pattern.sub("", value))
+
+                        if length > budget + len(self.representer.placeholder):
+                            value = _sgr_pattern.sub("", value)[:budget] + self.representer.placeholder
+                            length = len(value)
 
-                    yield f"  {key} = {value}\n"
+                    budget -= length
+
+                    yield ("  ", None, indent)
+                    yield (key, "traceback_scope_key_sgr", indent)
+                    yield (" = ", None, indent)
+                    yield (value, style, indent)
+                    yield ("\n", None, indent)
 
     def format_stack(
         self: Self,
@@ -1067,41 +1604,185 @@ class DefaultTracebackFormatter(TracebackFormatter):
         *,
         display_locals: bool | None = None,
     ) -> Iterator[str]:
-        last_filename = None
-        last_lineno = None
-        last_name = None
-        recursion_times = 0
+        yield from self._render(self._segment_stack(stack, context=self._create_context(), display_locals=display_locals, indent=""))
+
+    def _segment_stack(
+        self: Self,
+        stack: Iterable[tuple[FrameSummary | FrameType, tuple[int, int | None, int | None, int | None]]],
+        /,
+        *,
+        context: _Context,
+        display_locals: bool | None,
+        indent: str,
+    ) -> Iterator[_Segment]:
+        head_cutoff = self.elision_head_cutoff
+        tail_cutoff = self.elision_tail_cutoff
+
+        if head_cutoff is None and tail_cutoff is None:
+            yield from self._segment_frames(stack, context=context, display_locals=display_locals, indent=indent)
+            return
+
+        # NOTE: only the tail is buffered, in a ring buffer, so eliding
+        #       a stack uses O(head + tail) memory and formatting work
+        #       regardless of its depth.
+        iterator = iter(stack)
+
+        yield from self._segment_frames(itertools.islice(iterator, head_cutoff or 0), context=context, display_locals=display_locals, indent=indent)
+
+        tail = collections.deque(maxlen=tail_cutoff or 0)
+        times = 0
+
+        for frame in iterator:
+            if len(tail) == tail.maxlen:
+                times += 1
+
+            tail.append(frame)
+
+        if times:
+            yield (self.elision_message_format.format(times=times, times_s="" if times == 1 else "s"), "traceback_message_sgr", indent)
+            yield ("\n", None, indent)
+
+        yield from self._segment_frames(tail, context=context, display_locals=display_locals, indent=indent)
+
+    def _segment_frames(
+        self: Self,
+        stack: Iterable[tuple[FrameSummary | FrameType, tuple[int, int | None, int | None, int | None]]],
+        /,
+        *,
+        context: _Context,
+        display_locals: bool | None,
+        indent: str,
+    ) -> Iterator[_Segment]:
+        period_cutoff = max(self.recursion_period_cutoff, 1)
+        repeat_cutoff = max(self.recursion_cutoff - 1, 1)
+
+        # NOTE: cycles are detected in a single pass. runs[p] is the
+        #       number of consecutive frames equal to the frame p frames
+        #       before them. once a cycle of period p has been displayed
+        #       recursion_cutoff times, further repetitions are counted
+        #       rather than formatted. only the current incomplete
+        #       repetition is buffered, so this uses O(period_cutoff)
+        #       memory regardless of the depth of the stack.
+        keys: collections.deque[tuple[str, int, str]] = collections.deque(maxlen=period_cutoff)
+        runs = [0] * (period_cutoff + 1)
+        period = 0
+        times = 0
+        pending = list()
+        collapsed = 0
+
+        for frame in stack:
+            frame_summary, frame_position = frame
+
+            # NOTE: frames are filtered before any of their source or
+            #       locals are looked up.
+            if self.frame_filter is not None:
+                action = self._get_frame_action(frame_summary)
+
+                if action == "hide":
+                    continue
+
+                if action == "collapse":
+                    if period:
+                        yield from self._segment_recursion(period, times, indent=indent)
+
+                        for pending_frame in pending:
+                            yield from self._segment_frame(pending_frame, context=context, display_locals=display_locals, indent=indent)
+
+                        period = 0
+                        times = 0
+                        pending.clear()
+
+                    collapsed += 1
+                    continue
+
+                if collapsed:
+                    yield (self.collapse_message_format.format(times=collapsed, times_s="" if collapsed == 1 else "s"), "traceback_message_sgr", indent)
+                    yield ("\n", None, indent)
+
+                    # NOTE: recursion is not detected across collapsed
+                    #       frames.
+                    keys.clear()
+                    runs = [0] * (period_cutoff + 1)
+                    collapsed = 0
 
-        for frame_summary, frame_position in stack:
             if isinstance(frame_summary, types.FrameType):
-                current_filename = frame_summary.f_code.co_filename
-                current_name = frame_summary.f_code.co_name
+                key = (frame_summary.f_code.co_filename, frame_position[0], frame_summary.f_code.co_name)
             else:
-                current_filename = frame_summary.filename
-                current_name = frame_summary.name
+                key = (frame_summary.filename, frame_position[0], frame_summary.name)
 
-            current_lineno = frame_position[0]
+            if period:
+                if key == keys[-period]:
+                    keys.append(key)
+                    pending.append(frame)
 
-            if current_filename != last_filename or current_lineno != last_lineno or current_name != last_name:
-                if recursion_times > self.recursion_cutoff:
-                    times = recursion_times - self.recursion_cutoff
-                    yield self.recursion_message_format.format(times=times, times_s="" if times == 1 else "s") + "\n"
+                    if len(pending) == period:
+                        times += 1
+                        pending.clear()
 
-                last_filename = current_filename
-                last_lineno = current_lineno
-                last_name = current_name
-                recursion_times = 0
+                    continue
 
-            recursion_times += 1
+                yield from self._segment_recursion(period, times, indent=indent)
 
-            if recursion_times > self.recursion_cutoff:
-                continue
+                for pending_frame in pending:
+                    yield from self._segment_frame(pending_frame, context=context, display_locals=display_locals, indent=indent)
+
+                runs = [0] * (period_cutoff + 1)
+                period = 0
+                times = 0
+                pending.clear()
+
+            for p in range(1, len(keys) + 1):
+                runs[p] = runs[p] + 1 if keys[-p] == key else 0
+
+            keys.append(key)
+
+            yield from self._segment_frame(frame, context=context, display_locals=display_locals, indent=indent)
 
-            yield from self.format_frame((frame_summary, frame_position), display_locals=display_locals)
+            for p in range(1, period_cutoff + 1):
+                if runs[p] >= p * repeat_cutoff:
+                    period = p
+                    break
 
-        if recursion_times > self.recursion_cutoff:
-            times = recursion_times - self.recursion_cutoff
-            yield self.recursion_message_format.format(times=times, times_s="" if times == 1 else "s") + "\n"
+        if period:
+            yield from self._segment_recursion(period, times, indent=indent)
+
+            for pending_frame in pending:
+                yield from self._segment_frame(pending_frame, context=context, display_locals=display_locals, indent=indent)
+
+        if collapsed:
+            yield (self.collapse_message_format.format(times=collapsed, times_s="" if collapsed == 1 else "s"), "traceback_message_sgr", indent)
+            yield ("\n", None, indent)
+
+    def _get_frame_action(
+        self: Self,
+        frame_summary: FrameSummary | FrameType,
+        /,
+    ) -> str | None:
+        if self.frame_filter is None:
+            return None
+
+        if isinstance(frame_summary, types.FrameType):
+            return self.frame_filter.get_action(frame_summary.f_code.co_filename, frame_summary.f_globals.get("__name__"))
+
+        return self.frame_filter.get_action(frame_summary.filename)
+
+    def _segment_recursion(
+        self: Self,
+        period: int,
+        times: int,
+        /,
+        *,
+        indent: str,
+    ) -> Iterator[_Segment]:
+        if not times:
+            return
+
+        if period == 1:
+            yield (self.recursion_message_format.format(times=times, times_s="" if times == 1 else "s"), "traceback_message_sgr", indent)
+        else:
+            yield (self.recursion_cycle_message_format.format(frames=period, times=times, times_s="" if times == 1 else "s"), "traceback_message_sgr", indent)
+
+        yield ("\n", None, indent)
 
     def format_traceback(
         self: Self,
@@ -1113,35 +1794,341 @@ class DefaultTracebackFormatter(TracebackFormatter):
         chain: bool | None = None,
         display_locals: bool | None = None,
         limit: int | None = None,
-        seen: set | None = None,
     ) -> Iterator[str]:
-        if chain is None:
+        yield from self._render(self._segment_traceback(type, value, traceback, chain=chain, context=self._create_context(), display_locals=display_locals, limit=limit))
+
+    def _segment_traceback(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        chain: bool | None,
+        context: _Context,
+        display_locals: bool | None,
+        limit: int | None,
+    ) -> Iterator[_Segment]:
+        if chain is None or chain is MISSING:
             chain = True
 
+        yield from self._segment_chain(type, value, traceback, chain=chain, context=context, depth=0, display_locals=display_locals, limit=limit)
+
+    def _segment_chain(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        chain: bool,
+        context: _Context,
+        depth: int,
+        display_locals: bool | None,
+        limit: int | None,
+    ) -> Iterator[_Segment]:
+        # NOTE: the chain is collected iteratively, rather than by
+        #       recursing into each cause or context, so that chains
+        #       hundreds of exceptions long neither cost a frame per
+        #       exception nor hit the recursion limit. links[i] is the
+        #       exception reached from links[i - 1] and the header
+        #       which joins them. past chain_cutoff, the newest links
+        #       are kept along with the root, the oldest exception,
+        #       which is most often the one that matters.
+        links: list[tuple[BaseException | None, str | None]] = [(value, None)]
+        root: tuple[BaseException | None, str | None] | None = None
+        times = 0
+
         if chain and value is not None:
-            seen = seen or set()
-            seen.add(id(value))
+            chain_cutoff = max(self.chain_cutoff, 2)
+            seen = {id(value)}
+
+            while True:
+                value, header = self._get_chain_link(value, context=context)  # type: ignore  # value is only None when the loop ends
+
+                if value is None or id(value) in seen:
+                    break
+
+                seen.add(id(value))
+
+                if len(links) < chain_cutoff - 1:
+                    links.append((value, header))
+                else:
+                    if root is not None:
+                        times += 1
+
+                    root = (value, header)
+
+        indent = "  " * depth + "| " if depth else ""
+
+        # NOTE: the root is displayed first, and the newest links after
+        #       the message in place of those omitted between them.
+        if root is not None:
+            links.append(root)
+
+        above = None
+
+        for i in range(len(links) - 1, -1, -1):
+            value, header = links[i]
 
-            cause = value.__cause__
+            if i:
+                link_type, link_traceback = value.__class__, self._get_exception_traceback(value, context=context)  # type: ignore  # only links[0] can be None
+            else:
+                link_type, link_traceback = type, traceback
+
+            if sys.version_info >= (3, 11) and isinstance(value, BaseExceptionGroup):
+                yield from self._segment_group(link_type, value, link_traceback, above=above, chain=chain, context=context, depth=depth, display_locals=display_locals, limit=limit)
+            else:
+                yield from self._segment_chain_link(
+                    link_type, value, link_traceback, above=above, context=context, display_locals=display_locals, limit=limit, header=self.traceback_header, indent=indent
+                )
 
-            if cause is not None and id(cause) not in seen:
-                yield from self.format_traceback(cause.__class__, cause, cause.__traceback__, chain=chain, limit=limit, seen=seen)
-                yield f"\n{self.cause_header}\n\n"
+            if i:
+                yield ("\n", None, indent)
 
-            context = value.__context__
-            context_suppressed = value.__suppress_context__
+                if times and i == len(links) - 1:
+                    yield (self.chain_elision_message_format.format(times=times, times_s="" if times == 1 else "s"), "traceback_message_sgr", indent)
+                else:
+                    yield (header, "traceback_header_sgr", indent)  # type: ignore  # only links[0] has no header
+
+                yield ("\n", None, indent)
+                yield ("\n", None, indent)
 
-            if cause is None and context is not None and not context_suppressed and id(context) not in seen:
-                yield from self.format_traceback(context.__class__, context, context.__traceback__, chain=chain, limit=limit, seen=seen)
-                yield f"\n{self.context_header}\n\n"
+            above = link_traceback
 
+    def _segment_chain_link(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        above: TracebackType | None,
+        context: _Context,
+        display_locals: bool | None,
+        limit: int | None,
+        header: str,
+        indent: str,
+        header_indent: str | None = None,
+    ) -> Iterator[_Segment]:
         if traceback is not None:
-            yield f"{self.traceback_header}\n"
+            yield (header, "traceback_header_sgr", indent if header_indent is None else header_indent)
+            yield ("\n", None, indent if header_indent is None else header_indent)
+
+            stack_indent = indent + "  "
+            common = 0
+
+            # NOTE: with a limit, the frames displayed above are not
+            #       necessarily the frames in common.
+            if above is not None and self.common_cutoff is not None and limit is None and getattr(sys, "tracebacklimit", None) is None:
+                limit, common = self._count_common_frames(above, traceback)
+
+                if common < self.common_cutoff:
+                    limit, common = None, 0
+
+            if limit != 0:
+                yield from self._segment_stack(self.walk_stack(traceback, limit=limit), context=context, display_locals=display_locals, indent=stack_indent)
+
+            if common:
+                yield (self.common_message_format.format(times=common, times_s="" if common == 1 else "s"), "traceback_message_sgr", stack_indent)
+                yield ("\n", None, stack_indent)
+
+        yield from self._segment_exception(type, value, context=context, indent=indent)
+
+    def _segment_group(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: _ExceptionGroup,
+        traceback: TracebackType | None,
+        /,
+        *,
+        above: TracebackType | None,
+        chain: bool,
+        context: _Context,
+        depth: int,
+        display_locals: bool | None,
+        limit: int | None,
+    ) -> Iterator[_Segment]:
+        # NOTE: as in the traceback module, the group itself is drawn at
+        #       depth 1 when it is not already within another group,
+        #       and each of its sub-exceptions one deeper. the header of
+        #       a top-level group is drawn with a margin of "+", which
+        #       opens the box around its lines.
+        header_indent = "  + " if not depth else None
+        depth = max(depth, 1)
+        indent = "  " * depth + "| "
+
+        if depth > max(self.group_depth_cutoff, 1):
+            yield (self.group_depth_message_format.format(depth=self.group_depth_cutoff), "traceback_message_sgr", indent)
+            yield ("\n", None, indent)
+            return
+
+        yield from self._segment_chain_link(
+            type, value, traceback, above=above, context=context, display_locals=display_locals, limit=limit, header=self.group_header, indent=indent, header_indent=header_indent
+        )
+
+        # NOTE: only the first group_scan_cutoff sub-exceptions are
+        #       examined, of which those identical to an earlier one
+        #       are collapsed into the first, and only the first
+        #       group_width_cutoff distinct ones are displayed. the
+        #       cost of rendering a group is thus bounded by these
+        #       cutoffs rather than by the size of the group.
+        width_cutoff = max(self.group_width_cutoff, 1)
+        entries: list[list[Any]] = []
+        indexes: dict[tuple[Any, ...], int] = {}
+        shown = 0
+
+        for exception in itertools.islice(value.exceptions, max(self.group_scan_cutoff, width_cutoff)):
+            key = self._get_group_key(exception, chain=chain, context=context)
+
+            if key is not None and key in indexes:
+                entries[indexes[key]][1] += 1
+            elif len(entries) < width_cutoff:
+                if key is not None:
+                    indexes[key] = len(entries)
+
+                entries.append([exception, 1])
+            else:
+                continue
+
+            shown += 1
+
+        times = len(value.exceptions) - shown
+        box_indent = "  " * depth
+        sub_indent = box_indent + "  | "
+        closed = False
+
+        for i, (exception, count) in enumerate(entries):
+            yield (f"{'+-' if i == 0 else '  '}+---------------- {i + 1} ----------------\n", None, box_indent)
+
+            yield from self._segment_chain(
+                exception.__class__, exception, self._get_exception_traceback(exception, context=context), chain=chain, context=context, depth=depth + 1, display_locals=display_locals, limit=limit
+            )
+
+            if count > 1:
+                yield (self.group_identical_message_format.format(times=count - 1, times_s="" if count == 2 else "s"), "traceback_message_sgr", sub_indent)
+                yield ("\n", None, sub_indent)
+
+            # NOTE: a nested group which is displayed last closes the
+            #       box of its parent along with its own.
+            closed = sys.version_info >= (3, 11) and isinstance(exception, BaseExceptionGroup) and depth + 1 <= max(self.group_depth_cutoff, 1)
+
+        if times:
+            yield ("  +---------------- ... ----------------\n", None, box_indent)
+            yield (self.group_width_message_format.format(times=times, times_s="" if times == 1 else "s"), "traceback_message_sgr", sub_indent)
+            yield ("\n", None, sub_indent)
+            closed = False
+
+        if not closed:
+            yield ("  +------------------------------------\n", None, box_indent)
+
+    def _get_group_key(
+        self: Self,
+        value: BaseException,
+        /,
+        *,
+        chain: bool,
+        context: _Context,
+    ) -> tuple[Any, ...] | None:
+        # NOTE: sub-exceptions are identical when they are of the same
+        #       type, have the same message, and were raised through the
+        #       same instructions.
+        #       groups and exceptions with a chain to display are never
+        #       considered identical, as their display would differ.
+        if sys.version_info >= (3, 11) and isinstance(value, BaseExceptionGroup):
+            return None
+
+        if chain and self._get_chain_link(value, context=context)[0] is not None:
+            return None
+
+        key: list[Any] = [value.__class__, self._stringify_exception(value, context=context)]
+        node = self._get_exception_traceback(value, context=context)
+
+        while node is not None:
+            key.append(node.tb_frame.f_code)
+            key.append(node.tb_lasti)
+            node = node.tb_next
+
+        return tuple(key)
+
+    def _count_common_frames(
+        self: Self,
+        above: TracebackType,
+        traceback: TracebackType,
+        /,
+    ) -> tuple[int, int]:
+        # NOTE: a traceback only shares frames with the traceback of the
+        #       exception above it when it was built on top of it, e.g.
+        #       with BaseException.with_traceback, in which case its
+        #       trailing entries are the very same traceback objects.
+        #       a traceback raised while handling another never shares
+        #       any, as the other starts at the frame which caught it.
+        #       this returns the number of frames before those in common
+        #       and the number in common.
+        leading = 0
+        node: TracebackType | None = traceback
+
+        while node is not None:
+            if node is above:
+                common = 0
+
+                while node is not None:
+                    common += 1
+                    node = node.tb_next
+
+                return leading, common
+
+            leading += 1
+            node = node.tb_next
+
+        return leading, 0
+
+    def _get_chain_link(
+        self: Self,
+        value: BaseException,
+        /,
+        *,
+        context: _Context,
+    ) -> tuple[BaseException | None, str | None]:
+        state = self._get_exception_state(value, context=context)
+
+        if state is None:
+            cause, value_context, suppress_context = value.__cause__, value.__context__, value.__suppress_context__
+        else:
+            cause, value_context, suppress_context = state.cause, state.context, state.suppress_context
 
-            for line in self.format_stack(self.walk_stack(traceback, limit=limit), display_locals=display_locals):
-                yield textwrap.indent(line, "  ")
+        if cause is not None:
+            return cause, self.cause_header
 
-        yield from self.format_exception(type, value)
+        if value_context is not None and not suppress_context:
+            return value_context, self.context_header
+
+        return None, None
+
+    def _get_exception_state(
+        self: Self,
+        value: BaseException | None,
+        /,
+        *,
+        context: _Context,
+    ) -> _ExceptionState | None:
+        states = context.snapshot_exceptions
+
+        if states is None:
+            return None
+
+        return states.get(id(value))
+
+    def _get_exception_traceback(
+        self: Self,
+        value: BaseException,
+        /,
+        *,
+        context: _Context,
+    ) -> TracebackType | None:
+        state = self._get_exception_state(value, context=context)
+
+        return value.__traceback__ if state is None else state.traceback
 
     def walk_stack(
         self: Self,
@@ -1150,43 +2137,413 @@ class DefaultTracebackFormatter(TracebackFormatter):
         *,
         limit: int | None = None,
     ) -> Iterator[tuple[FrameType, tuple[int, int | None, int | None, int | None]]]:
-        if limit is not None:
-            limit = max(limit, 0)
-        elif isinstance(obj, types.TracebackType):
-            limit = limit or getattr(sys, "tracebacklimit", None)
-            if limit and limit < 0:
+        if limit is MISSING:
+            limit = None
+
+        if limit is None and isinstance(obj, types.TracebackType):
+            limit = getattr(sys, "tracebacklimit", None)
+            if limit is not None and limit < 0:
                 limit = 0
 
+        nodes: Iterable[FrameType | TracebackType]
+
         if isinstance(obj, types.FrameType):
-            frame = obj
 
-            while frame is not None and limit != 0:
-                yield frame, (frame.f_lineno, None, None, None)
-                frame = frame.f_back
+            def walk_frames(frame: FrameType | None) -> Iterator[FrameType]:
+                while frame is not None:
+                    yield frame
+                    frame = frame.f_back
 
-                if limit:
-                    limit -= 1
+            nodes = walk_frames(obj)
         elif isinstance(obj, types.TracebackType):
-            traceback = obj
 
-            while traceback is not None and limit != 0:
-                if sys.version_info >= (3, 11):
-                    if traceback.tb_lasti >= 0:
-                        start_line, end_line, start_column, end_column = next(itertools.islice(traceback.tb_frame.f_code.co_positions(), traceback.tb_lasti // 2, None))
+            def walk_tracebacks(traceback: TracebackType | None) -> Iterator[TracebackType]:
+                while traceback is not None:
+                    yield traceback
+                    traceback = traceback.tb_next
+
+            nodes = walk_tracebacks(obj)
+        else:
+            return
+
+        # NOTE: a negative limit keeps the last -limit frames, as in
+        #       traceback.StackSummary.extract. only those are kept in
+        #       memory and have their position looked up.
+        if limit is not None:
+            if limit >= 0:
+                nodes = itertools.islice(nodes, limit)
+            else:
+                nodes = collections.deque(nodes, maxlen=-limit)
+
+        for node in nodes:
+            if isinstance(node, types.FrameType):
+                yield node, (node.f_lineno, None, None, None)
+            elif sys.version_info >= (3, 11) and node.tb_lasti >= 0:
+                start_line, end_line, start_column, end_column = self.position_cache.get(node.tb_frame.f_code, node.tb_lasti)
+
+                if start_line is None:
+                    start_line = node.tb_lineno
+
+                yield node.tb_frame, (start_line, end_line, start_column, end_column)
+            else:
+                yield node.tb_frame, (node.tb_lineno, None, None, None)
+
+    def write_exception(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        /,
+        *,
+        stream: TextIO,
+    ) -> None:
+        theme = self._get_theme(stream)
+
+        self._write(stream, self._render(self._segment_exception(type, value, context=self._create_context(theme=theme), indent=""), theme=theme))
+
+    def write_frame(
+        self: Self,
+        frame: tuple[FrameSummary | FrameType, tuple[int, int | None, int | None, int | None]],
+        /,
+        *,
+        stream: TextIO,
+        display_locals: bool | None = None,
+    ) -> None:
+        theme = self._get_theme(stream)
 
-                        if start_line is None:
-                            start_line = traceback.tb_lineno
+        self._write(stream, self._render(self._segment_frame(frame, context=self._create_context(theme=theme), display_locals=display_locals, indent=""), theme=theme))
 
-                        yield traceback.tb_frame, (start_line, end_line, start_column, end_column)
+    def write_stack(
+        self: Self,
+        stack: Iterable[tuple[FrameSummary | FrameType, tuple[int, int | None, int | None, int | None]]],
+        /,
+        *,
+        stream: TextIO,
+        display_locals: bool | None = None,
+    ) -> None:
+        theme = self._get_theme(stream)
+
+        self._write(stream, self._render(self._segment_stack(stack, context=self._create_context(theme=theme), display_locals=display_locals, indent=""), theme=theme))
+
+    def write_traceback(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        stream: TextIO,
+        chain: bool | None = None,
+        display_locals: bool | None = None,
+        limit: int | None = None,
+    ) -> None:
+        theme = self._get_theme(stream)
+        segments = self._segment_traceback(type, value, traceback, chain=chain, context=self._create_context(theme=theme), display_locals=display_locals, limit=limit)
+
+        self._write_traceback_segments(type, value, traceback, segments, stream=stream, theme=theme)
+
+    def _take_snapshot(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        chain: bool | None = None,
+        display_locals: bool | None = None,
+        limit: int | None = None,
+        represent_locals: bool = False,
+    ) -> _Snapshot:
+        snapshot = _Snapshot(type, value, traceback, chain=chain, display_locals=display_locals, limit=limit)  # type: ignore  # None stands in for MISSING
+        snapshot.exceptions = self._snapshot_exceptions(value, traceback, chain=chain is None or chain is MISSING or chain)
+
+        # NOTE: the locals of running frames keep changing, and are not
+        #       safe to read from another thread, so they are always
+        #       captured here, either as copies or as representations.
+        if display_locals:
+            tracebacks = [state.traceback for state in snapshot.exceptions.values()] if value is not None else [traceback]
+            snapshot.locals = self._snapshot_locals(tracebacks, represent=represent_locals)
+            snapshot.represented = represent_locals
+
+        return snapshot
+
+    def _snapshot_exceptions(
+        self: Self,
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        /,
+        *,
+        chain: bool,
+    ) -> dict[int, _ExceptionState]:
+        # NOTE: the state of every exception which may be displayed is
+        #       captured. the exceptions visited are bounded as they are
+        #       when rendered, by chain_cutoff and group_scan_cutoff.
+        states: dict[int, _ExceptionState] = dict()
+        pending: list[tuple[BaseException | None, TracebackType | None]] = [(value, traceback)]
+        cutoff = max(self.chain_cutoff, 1) + max(self.group_scan_cutoff, 1)
+
+        while pending and len(states) < cutoff:
+            value, traceback = pending.pop()
+
+            if value is None or id(value) in states:
+                continue
+
+            notes = self._stringify_notes(value) if sys.version_info >= (3, 11) else None
+            state = states[id(value)] = _ExceptionState(value, traceback, self.representer.stringify(value), notes)
+
+            if chain:
+                if state.cause is not None:
+                    pending.append((state.cause, state.cause.__traceback__))
+                elif state.context is not None and not state.suppress_context:
+                    pending.append((state.context, state.context.__traceback__))
+
+            if sys.version_info >= (3, 11) and isinstance(value, BaseExceptionGroup):
+                for exception in itertools.islice(value.exceptions, max(self.group_scan_cutoff, 1)):
+                    pending.append((exception, exception.__traceback__))
+
+        return states
+
+    def _snapshot_locals(
+        self: Self,
+        tracebacks: Iterable[TracebackType | None],
+        /,
+        *,
+        represent: bool,
+    ) -> dict[FrameType, dict[str, Any]]:
+        # NOTE: the locals of every frame which may be displayed are
+        #       copied, or represented as they would be when rendered,
+        #       each frame within locals_budget.
+        deadline = self._create_context().deadline
+        snapshot: dict[FrameType, dict[str, Any]] = dict()
+        reprs: dict[int, str] = dict()
+
+        for node in tracebacks:
+            while node is not None:
+                frame = node.tb_frame
+                node = node.tb_next
+
+                if frame in snapshot or self._get_frame_action(frame) == "no_locals":
+                    continue
+
+                if not represent:
+                    snapshot[frame] = dict(frame.f_locals)
+                    continue
+
+                budget = self.locals_budget
+                locals: dict[str, str] = dict()
+
+                for key, obj in sorted(frame.f_locals.items()):
+                    if budget <= 0:
+                        # NOTE: never displayed, but counted as omitted.
+                        locals[key] = ""
+                        continue
+
+                    if obj.__class__ in _scalar_types:
+                        string = self.representer.represent(obj, max_chars=budget, deadline=deadline)
+                    elif id(obj) in reprs:
+                        string = reprs[id(obj)]
                     else:
-                        yield traceback.tb_frame, (traceback.tb_lineno, None, None, None)
+                        # NOTE: as when rendered, the memo holds the
+                        #       representation within the whole
+                        #       locals_budget.
+                        string = reprs[id(obj)] = self.representer.represent(obj, max_chars=self.locals_budget, deadline=deadline)
+
+                    if len(string) > budget:
+                        string = string[:budget] + self.representer.placeholder
+
+                    locals[key] = string
+                    budget -= len(string)
+
+                snapshot[frame] = locals
+
+        return snapshot
+
+    def _write_snapshot(
+        self: Self,
+        snapshot: _Snapshot,
+        /,
+        *,
+        stream: TextIO,
+    ) -> None:
+        if snapshot.exceptions is None:
+            super()._write_snapshot(snapshot, stream=stream)
+            return
+
+        theme = self._get_theme(stream)
+        context = self._create_context(theme=theme)
+        context.snapshot_exceptions = snapshot.exceptions
+        context.snapshot_locals = snapshot.locals
+        context.snapshot_represented = snapshot.represented
+        segments = self._segment_traceback(snapshot.type, snapshot.value, snapshot.traceback, chain=snapshot.chain, context=context, display_locals=snapshot.display_locals, limit=snapshot.limit)
+
+        self._write_traceback_segments(snapshot.type, snapshot.value, snapshot.traceback, segments, stream=stream, theme=theme)
+
+    def _create_context(
+        self: Self,
+        /,
+        *,
+        theme: dict[str, Any] | None = None,
+    ) -> _Context:
+        render_timeout = self.render_timeout
+
+        return _Context(None if render_timeout is None else time.monotonic() + render_timeout, theme)
+
+    def _get_path_separator(
+        self: Self,
+        /,
+    ) -> str:
+        return os.sep
+
+    def _get_theme(
+        self: Self,
+        stream: TextIO,
+        /,
+    ) -> dict[str, Any] | None:
+        return None
+
+    def _write(
+        self: Self,
+        stream: TextIO,
+        lines: Iterable[str],
+        /,
+    ) -> None:
+        # NOTE: lines are written as they are rendered, in chunks of
+        #       about write_buffer_size characters, so neither the
+        #       memory used nor the delay before the first write grow
+        #       with the size of the output.
+        buffer_size = self.write_buffer_size
+        buffer: list[str] = []
+        size = 0
+
+        for line in lines:
+            buffer.append(line)
+            size += len(line)
+
+            if size >= buffer_size:
+                stream.write("".join(buffer))
+                buffer.clear()
+                size = 0
+
+        if buffer:
+            stream.write("".join(buffer))
+
+    def _write_traceback_segments(
+        self: Self,
+        type: type[BaseException] | type[None],
+        value: BaseException | None,
+        traceback: TracebackType | None,
+        segments: Iterable[_Segment],
+        /,
+        *,
+        stream: TextIO,
+        theme: dict[str, Any] | None,
+    ) -> None:
+        # NOTE: rendering a MemoryError as usual allocates the memory
+        #       which just ran out, so it goes straight to the emergency
+        #       traceback, which releases the reserve before anything
+        #       else. a RecursionError is rendered as usual, with the
+        #       reserved recursion headroom, and is streamed like any
+        #       other traceback. only when rendering it fails anyway is
+        #       an emergency traceback written after what was written.
+        if isinstance(value, MemoryError):
+            write_emergency_traceback(type, value, traceback, stream=stream)
+            return
+
+        if not isinstance(value, RecursionError):
+            self._write(stream, self._render(segments, theme=theme))
+            return
+
+        try:
+            with _recursion_headroom():
+                self._write(stream, self._render(segments, theme=theme))
+        except (MemoryError, RecursionError):
+            write_emergency_traceback(type, value, traceback, stream=stream)
+
+    def _highlight(
+        self: Self,
+        line: str,
+        spans: Iterable[tuple[int, int, str]],
+        /,
+        *,
+        context: _Context,
+    ) -> str:
+        # NOTE: the SGR sequences are joined with the pieces of the line
+        #       at once, so only the pieces themselves are new strings.
+        span_sgr = context.span_sgr
+        source_sgr = context.source_sgr
+        source_start, source_end = source_sgr
+        length = len(line) - 1 if line.endswith("\n") else len(line)
+        parts: list[str] = []
+        column = 0
+
+        for start, end, kind in spans:
+            if start > column:
+                parts += (source_start, line[column:start], source_end)
+
+            sgr_start, sgr_end = span_sgr.get(kind, source_sgr)
+            parts += (sgr_start, line[start:end], sgr_end)
+            column = end
+
+        if column < length:
+            parts += (source_start, line[column:length], source_end)
+
+        return "".join(parts)
+
+    def _render(
+        self: Self,
+        segments: Iterable[_Segment],
+        /,
+        *,
+        theme: dict[str, Any] | None = None,
+    ) -> Iterator[str]:
+        # NOTE: segments are (text, style, indent) tuples, where style is
+        #       the key of an SGR sequence in the theme and indent is
+        #       the prefix of the line the text starts, if it starts
+        #       one. the text of a segment ends at most one line, which
+        #       is yielded as soon as it is complete. SGR sequences are
+        #       only applied when a theme is given, and are looked up
+        #       once per style, so styling text creates no new strings.
+        parts: list[str] = []
+        sgrs: dict[str, tuple[str, str] | None] = dict()
+
+        for text, style, indent in segments:
+            if not text:
+                continue
+
+            if indent and text.find("\n", 0, len(text) - 1) != -1:
+                lines: Iterable[str] = text.splitlines(True)
+            else:
+                lines = (text,)
+
+            for line in lines:
+                if indent and not parts:
+                    parts.append(indent)
+
+                end = line.endswith("\n")
+
+                if theme is not None and style is not None:
+                    try:
+                        sgr = sgrs[style]
+                    except KeyError:
+                        sgr = sgrs[style] = _compile_sgr(theme, {style: style}).get(style)
                 else:
-                    yield traceback.tb_frame, (traceback.tb_lineno, None, None, None)
+                    sgr = None
 
-                traceback = traceback.tb_next
+                if sgr is not None:
+                    parts.append(sgr[0])
+                    parts.append(line[:-1] if end else line)
+                    parts.append(sgr[1])
 
-                if limit:
-                    limit -= 1
+                    if end:
+                        parts.append("\n")
+                else:
+                    parts.append(line)
+
+                if end:
+                    yield "".join(parts)
+                    parts.clear()
+
+        if parts:
+            yield "".join(parts)
 
 
 class PrettyTracebackFormatter(DefaultTracebackFormatter):
@@ -1202,18 +2559,111 @@ class PrettyTracebackFormatter(DefaultTracebackFormatter):
     ----------
     cause_header: :class:`str`
         The message yielded after an exception's cause.
+    chain_cutoff: :class:`int`
+        The maximum number of chained exceptions to display, of at
+        least two. When a chain is longer, its root exception and the
+        newest ``chain_cutoff - 1`` exceptions are displayed.
+    chain_elision_message_format: :class:`str`
+        The format for the message yielded in place of the chained
+        exceptions between the root exception and the newest ones.
+    collapse_message_format: :class:`str`
+        The format for the message yielded in place of a run of frames
+        collapsed by ``frame_filter``.
+    common_cutoff: Optional[:class:`int`]
+        The number of trailing frames a traceback must share with the
+        traceback of the exception displayed above it before they are
+        elided, e.g. when an exception is raised with
+        :meth:`~BaseException.with_traceback` of the exception it was
+        raised while handling. When ``None``, no frames are elided.
+    common_message_format: :class:`str`
+        The format for the message yielded in place of frames shared
+        with the exception displayed above.
     context_header: :class:`str`
         The message yielded after an exception's context.
+    elision_head_cutoff: Optional[:class:`int`]
+        The number of frames to display at the start of a stack before
+        eliding the rest. When this and ``elision_tail_cutoff`` are
+        both ``None``, no frames are elided.
+    elision_message_format: :class:`str`
+        The format for the message yielded in place of elided frames.
+    elision_tail_cutoff: Optional[:class:`int`]
+        The number of frames to display at the end of a stack after
+        eliding the rest. When this and ``elision_head_cutoff`` are
+        both ``None``, no frames are elided.
+    frame_filter: Optional[:class:`~pretty.traceback.FrameFilter`]
+        The rules used to hide or collapse frames, or to display them
+        without their locals. When ``None``, every frame is displayed.
+    group_depth_cutoff: :class:`int`
+        The maximum depth of nested exception groups to display.
+    group_depth_message_format: :class:`str`
+        The format for the message yielded in place of exception
+        groups nested deeper than ``group_depth_cutoff``.
+    group_header: :class:`str`
+        The message yielded before an exception group's traceback.
+    group_identical_message_format: :class:`str`
+        The format for the message yielded in place of the
+        sub-exceptions of an exception group which are identical to
+        the one displayed, i.e. of the same type and with the same
+        message and traceback.
+    group_scan_cutoff: :class:`int`
+        The maximum number of sub-exceptions of an exception group to
+        examine for identical sub-exceptions.
+    group_width_cutoff: :class:`int`
+        The maximum number of distinct sub-exceptions of an exception
+        group to display.
+    group_width_message_format: :class:`str`
+        The format for the message yielded in place of sub-exceptions
+        beyond ``group_width_cutoff`` or ``group_scan_cutoff``.
+    locals_budget: :class:`int`
+        The maximum total number of characters of the representations
+        of the locals displayed in each frame.
+    locals_message_format: :class:`str`
+        The format for the message yielded in place of locals beyond
+        ``locals_budget``.
+    locals_reference_format: Optional[:class:`str`]
+        The format for the message yielded in place of the
+        representation of a local which has already been displayed in
+        an earlier frame, e.g. ``"<same as frame {frame}: {name}>"``.
+        When ``None``, the representation is displayed again.
+    path_cache: Optional[:class:`~pretty.traceback.PathCache`]
+        The cache used to shorten the filenames displayed in frame
+        locations. When ``None``, filenames are displayed as they are.
+    position_cache: :class:`~pretty.traceback.PositionCache`
+        The cache used to look up instruction positions.
     recursion_cutoff: :class:`int`
-        The number of the same frame to display before instead
-        displaying a recursion message.
+        The number of the same frame, or cycle of frames, to display
+        before instead displaying a recursion message.
+    recursion_cycle_message_format: :class:`str`
+        The format for the message yielded in place of recursive
+        cycles of frames.
     recursion_message_format: :class:`str`
         The format for the message yielded in place of recursive
         frames.
+    recursion_period_cutoff: :class:`int`
+        The maximum number of frames in a cycle to detect recursion
+        across.
+    render_timeout: Optional[:class:`float`]
+        The maximum total time, in seconds, to spend calling the
+        :meth:`~object.__repr__` methods of locals in a single render,
+        after which they are no longer called. When ``None``, only the
+        ``timeout`` of the representer applies.
+    representer: :class:`~pretty.utility.Representer`
+        The representer used to represent exception values, notes,
+        and locals.
+    source_cache: :class:`~pretty.traceback.SourceCache`
+        The cache used to look up source lines.
+    source_cutoff: :class:`int`
+        The maximum number of lines of a statement spanning several
+        lines to display.
+    source_message_format: :class:`str`
+        The format for the message yielded in place of the lines of a
+        statement beyond ``source_cutoff``.
     theme: :class:`dict`
         A theme.
     traceback_header: :class:`str`
         The message yielded before an exception's traceback.
+    write_buffer_size: :class:`int`
+        The number of characters to buffer before writing to a stream.
     """
 
     __slots__ = ("theme",)
@@ -1226,6 +2676,19 @@ class PrettyTracebackFormatter(DefaultTracebackFormatter):
     ) -> None:
         self.theme = (theme or pretty.utility.pretty_theme).copy()
 
+    def _get_theme(
+        self: Self,
+        stream: TextIO,
+        /,
+    ) -> dict[str, Any] | None:
+        return self.theme if wants_ansi_sgr(stream) else None
+
+    def _get_path_separator(
+        self: Self,
+        /,
+    ) -> str:
+        return self.theme.get("char_pathnamesep") or os.sep
+
 
 __all__ = [
     "TracebackFormatter",
@@ -0,0 +1,257 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from logging import LogRecord
+    from typing import Any, Literal
+    from typing_extensions import Self, TypeAlias
+
+    from _typeshed import OptExcInfo
+
+    _Mode: TypeAlias = "Literal['compact', 'full', 'structured']"
+
+import json
+import logging
+import os
+
+import pretty
+from pretty.traceback.formatter import DefaultTracebackFormatter, TracebackFormatter
+from pretty.utility import MISSING
+
+
+_modes = frozenset(["compact", "full", "structured"])
+
+_default_formatter = DefaultTracebackFormatter()
+
+
+class TracebackLoggingFormatter(logging.Formatter):
+    """
+    A :class:`logging.Formatter` which renders the exceptions of
+    records with a :class:`~pretty.traceback.TracebackFormatter`.
+
+    A record's exception is rendered when a handler formats the record
+    for the first time, i.e. only when the record is actually emitted,
+    and the result is cached on the record, so it is rendered once no
+    matter how many handlers using this class emit it. In ``"full"``
+    mode, the result is also stored as the record's ``exc_text``, which
+    other :class:`logging.Formatter` instances then use as it is.
+
+    Exceptions are rendered in one of the following modes:
+
+    - ``"full"``, as the traceback formatter renders them.
+    - ``"compact"``, on the same line as the message, as each
+      exception of the chain followed by the location of each of its
+      frames, e.g. ``ValueError: bad [app.py:8 in parse < app.py:3 in
+      main]``.
+    - ``"structured"``, on a single line following the message, as a
+      JSON object with the ``type``, ``message``, ``frames``, and
+      ``cause`` or ``context`` of the exception.
+
+    Parameters
+    ----------
+    fmt: Optional[:class:`str`]
+        The format of the message, as in :class:`logging.Formatter`.
+    datefmt: Optional[:class:`str`]
+        The format of the date, as in :class:`logging.Formatter`.
+    style: :class:`str`
+        The style of ``fmt``, as in :class:`logging.Formatter`.
+    validate: :class:`bool`
+        Whether to validate ``fmt``, as in :class:`logging.Formatter`.
+    display_locals: Optional[:class:`bool`]
+        Whether to display the locals in each frame in ``"full"`` mode.
+    formatter: :class:`~pretty.traceback.TracebackFormatter`
+        The formatter to render exceptions with. Defaults to the
+        formatter installed by :func:`~pretty.traceback.hook` at the
+        time a record is formatted, or a
+        :class:`~pretty.traceback.DefaultTracebackFormatter` when
+        there is none.
+    mode: :class:`str`
+        The mode exceptions are rendered in.
+
+    Attributes
+    ----------
+    display_locals: Optional[:class:`bool`]
+        Whether to display the locals in each frame in ``"full"`` mode.
+    formatter: Optional[:class:`~pretty.traceback.TracebackFormatter`]
+        The formatter to render exceptions with, or ``None`` for the
+        formatter installed by :func:`~pretty.traceback.hook`.
+    mode: :class:`str`
+        The mode exceptions are rendered in.
+    """
+
+    def __init__(
+        self: Self,
+        fmt: str | None = None,
+        datefmt: str | None = None,
+        style: Literal["%", "{", "$"] = "%",
+        validate: bool = True,
+        *,
+        display_locals: bool | None = None,
+        formatter: TracebackFormatter = MISSING,
+        mode: _Mode = "full",
+    ) -> None:
+        if mode not in _modes:
+            raise ValueError(f"mode must be one of {', '.join(map(repr, sorted(_modes)))}, not {mode!r}")
+
+        super().__init__(fmt, datefmt, style, validate)
+
+        self.display_locals = display_locals
+        self.formatter = formatter or None
+        self.mode = mode
+
+    def format(
+        self: Self,
+        record: LogRecord,
+        /,
+    ) -> str:
+        record.message = record.getMessage()
+
+        if self.usesTime():
+            record.asctime = self.formatTime(record, self.datefmt)
+
+        s = self.formatMessage(record)
+
+        if record.exc_info and record.exc_info[1] is not None:
+            text = self._get_exception_text(record)
+
+            if text:
+                s = f"{s} {text}" if self.mode == "compact" else f"{s}\n{text}"
+
+        if record.stack_info:
+            s = f"{s}\n{self.formatStack(record.stack_info)}"
+
+        return s
+
+    def formatException(
+        self: Self,
+        ei: OptExcInfo,
+        /,
+    ) -> str:
+        type, value, traceback = ei
+
+        return "".join(self._get_formatter().format_traceback(type, value, traceback, display_locals=self.display_locals)).rstrip("\n")  # type: ignore  # None is passed on as is
+
+    def _get_exception_text(
+        self: Self,
+        record: LogRecord,
+        /,
+    ) -> str:
+        # NOTE: cached on the record, by mode and formatter, so each
+        #       handler emitting the record reuses the first rendering.
+        key = (self.mode, self.display_locals, id(self._get_formatter()))
+        cache: dict[tuple[Any, ...], str] | None = record.__dict__.get("_pretty_exc_texts")
+
+        if cache is None:
+            cache = record.__dict__["_pretty_exc_texts"] = dict()
+        elif key in cache:
+            return cache[key]
+
+        if self.mode == "full":
+            text = self.formatException(record.exc_info)  # type: ignore  # checked by format
+
+            if not record.exc_text:
+                record.exc_text = text
+        elif self.mode == "compact":
+            text = self._format_compact(record.exc_info[1])  # type: ignore  # checked by format
+        else:
+            text = json.dumps(self._get_structure(record.exc_info[1]), ensure_ascii=False, separators=(",", ":"))  # type: ignore  # checked by format
+
+        cache[key] = text
+
+        return text
+
+    def _format_compact(
+        self: Self,
+        value: BaseException,
+        /,
+    ) -> str:
+        parts = []
+        structure: dict[str, Any] | None = self._get_structure(value)
+
+        while structure is not None:
+            message = structure["message"].replace("\n", " ")
+            frames = " < ".join(f"{frame['filename']}:{frame['lineno']} in {frame['name']}" for frame in reversed(structure["frames"]))
+            part = f"{structure['type']}: {message}" if message else structure["type"]
+
+            parts.append(f"{part} [{frames}]" if frames else part)
+
+            if "cause" in structure:
+                parts.append("from")
+                structure = structure["cause"]
+            elif "context" in structure:
+                parts.append("during")
+                structure = structure["context"]
+            else:
+                structure = None
+
+        return " ".join(parts)
+
+    def _get_formatter(
+        self: Self,
+        /,
+    ) -> TracebackFormatter:
+        return self.formatter or pretty.traceback._formatter or _default_formatter
+
+    def _get_structure(
+        self: Self,
+        value: BaseException,
+        /,
+    ) -> dict[str, Any]:
+        # NOTE: the chain is followed iteratively, up to chain_cutoff
+        #       exceptions, as it is when rendered in full.
+        formatter = self._get_formatter()
+
+        if isinstance(formatter, DefaultTracebackFormatter):
+            chain_cutoff = max(formatter.chain_cutoff, 1)
+            path_cache = formatter.path_cache
+            stringify = formatter.representer.stringify
+        else:
+            chain_cutoff = DefaultTracebackFormatter.chain_cutoff
+            path_cache = None
+            stringify = pretty.utility.Representer().stringify
+
+        root: dict[str, Any] = dict()
+        structure = root
+        seen = {id(value)}
+
+        while True:
+            frames = []
+
+            # NOTE: an exception which was never raised, e.g. one logged
+            #       as it was created, has no traceback.
+            if value.__traceback__ is not None:
+                for frame, position in formatter.walk_stack(value.__traceback__):
+                    filename = frame.f_code.co_filename
+
+                    frames.append(
+                        {
+                            "filename": path_cache.get(filename, os.sep) if path_cache is not None else filename,
+                            "lineno": position[0],
+                            "name": frame.f_code.co_name,
+                        }
+                    )
+
+            structure["type"] = pretty.utility.try_name(value.__class__, default="<type.__name__ failed>")
+            structure["message"] = stringify(value)
+            structure["frames"] = frames
+
+            if value.__cause__ is not None:
+                key, value = "cause", value.__cause__
+            elif value.__context__ is not None and not value.__suppress_context__:
+                key, value = "context", value.__context__
+            else:
+                break
+
+            if id(value) in seen or len(seen) >= chain_cutoff:
+                break
+
+            seen.add(id(value))
+
+            structure[key] = structure = dict()
+
+        return root
+
+
+__all__ = [
+    "TracebackLoggingFormatter",
+]
@@ -0,0 +1,145 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing import Callable, TextIO
+    from typing_extensions import Self
+
+import threading
+
+
+# NOTE: reentrant, as writing a report may make another on the same
+#       thread, e.g. when an object freed during the write fails in
+#       __del__ and sys.unraisablehook is called.
+_lock = threading.RLock()
+
+
+class _Buffer:
+    # NOTE: stands in for the stream while a report is rendered, so
+    #       that it is styled as it would be for the stream itself.
+    #       once more than max_size characters have been written, _lock
+    #       is taken and the rest is written to the stream directly, so
+    #       a long report does not have to be held in memory at once.
+    __slots__ = ("encoding", "errors", "locked", "max_size", "parts", "size", "stream")
+
+    def __init__(
+        self: Self,
+        stream: TextIO,
+        max_size: int,
+        /,
+    ) -> None:
+        self.encoding = getattr(stream, "encoding", None) or "utf-8"
+        self.errors = getattr(stream, "errors", None) or "strict"
+        self.locked = False
+        self.max_size = max_size
+        self.parts: list[str] = []
+        self.size = 0
+        self.stream = stream
+
+    def flush(
+        self: Self,
+        /,
+    ) -> None:
+        if self.locked:
+            self.stream.flush()
+
+    def isatty(
+        self: Self,
+        /,
+    ) -> bool:
+        try:
+            return self.stream.isatty()
+        except Exception:
+            return False
+
+    def write(
+        self: Self,
+        string: str,
+        /,
+    ) -> int:
+        if self.locked:
+            self.stream.write(string)
+            return len(string)
+
+        self.parts.append(string)
+        self.size += len(string)
+
+        if self.size > self.max_size:
+            _lock.acquire()
+            self.locked = True
+
+            self.stream.write("".join(self.parts))
+            self.parts.clear()
+
+        return len(string)
+
+
+def write_report(
+    render: Callable[[TextIO], object],
+    /,
+    *,
+    stream: TextIO,
+    buffered: bool = True,
+    max_buffer_size: int = 32 * 1024,
+) -> None:
+    """
+    Renders a report, then writes it to a stream in one piece.
+
+    The report is rendered into a buffer standing in for the stream,
+    without holding any lock, and then written while holding a lock
+    shared by all reports, so reports written by several threads at
+    once are neither interleaved nor rendered one at a time. Once the
+    buffer holds more than ``max_buffer_size`` characters, the lock is
+    taken and the rest of the report is written as it is rendered, so
+    that the memory used does not grow with the size of the report.
+
+    Reports of :class:`MemoryError` and :class:`RecursionError` should
+    not be buffered, as buffering them allocates as much memory as the
+    report takes, and would keep
+    :func:`~pretty.traceback.write_emergency_traceback` from writing
+    directly to the stream's file descriptor. Unbuffered reports are
+    rendered directly to the stream while holding the lock.
+
+    This function is used by the hooks installed by
+    :func:`~pretty.traceback.hook`.
+
+    Parameters
+    ----------
+    render: Callable[[:func:`TextIO <open>`], Any]
+        The function rendering the report, which is passed the buffer
+        to write to, e.g. ``lambda stream: formatter.write_traceback(
+        type, value, traceback, stream=stream)``.
+    stream: :func:`TextIO <open>`
+        The stream to write to.
+    buffered: :class:`bool`
+        Whether to render the report into a buffer.
+    max_buffer_size: :class:`int`
+        The maximum number of characters to buffer before the rest of
+        the report is written as it is rendered.
+    """
+
+    if not buffered:
+        with _lock:
+            render(stream)
+            stream.flush()
+
+        return
+
+    buffer = _Buffer(stream, max_buffer_size)
+
+    try:
+        render(buffer)  # type: ignore  # the buffer stands in for a TextIO
+
+        with _lock:
+            if buffer.parts:
+                stream.write("".join(buffer.parts))
+
+            stream.flush()
+    finally:
+        if buffer.locked:
+            _lock.release()
+
+
+__all__ = [
+    "write_report",
+]
@@ -0,0 +1,188 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterable
+    from typing_extensions import Self
+
+import os
+import sys
+import threading
+
+import pretty
+
+
+class PathCache:
+    """
+    A bounded, thread-safe cache of shortened display paths of files.
+
+    A file's display path is its path relative to the longest entry of
+    :data:`sys.path`, or of ``roots``, which contains it, e.g.
+    ``"json/decoder.py"`` rather than
+    ``"/usr/lib/python3.12/json/decoder.py"``. Files outside of all of
+    them are displayed relative to the home directory, e.g.
+    ``"~/script.py"``, when ``home`` is set, and are otherwise
+    displayed as they are.
+
+    Each file's display path is computed once. The cache is cleared
+    whenever :data:`sys.path` changes.
+
+    Parameters
+    ----------
+    roots: Iterable[:class:`str`]
+        The paths of directories to display files relative to, in
+        addition to the entries of :data:`sys.path`, e.g. the root of
+        a project.
+    home: :class:`bool`
+        Whether to display files in the home directory relative to it.
+    max_size: :class:`int`
+        The maximum number of display paths to cache.
+
+    Attributes
+    ----------
+    home: :class:`bool`
+        Whether to display files in the home directory relative to it.
+    max_size: :class:`int`
+        The maximum number of display paths to cache.
+    roots: Tuple[:class:`str`, ...]
+        The paths of directories to display files relative to, in
+        addition to the entries of :data:`sys.path`.
+    """
+
+    __slots__ = ("_lock", "_paths", "_prefixes", "_sys_path", "home", "max_size", "roots")
+
+    def __init__(
+        self: Self,
+        roots: Iterable[str] = (),
+        /,
+        *,
+        home: bool = True,
+        max_size: int = 1024,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+
+        self._lock = threading.Lock()
+        self._paths: pretty.utility.LRUCache[tuple[str, str], str] = pretty.utility.LRUCache(max_size=max_size)
+        self._prefixes: list[str] = []
+        self._sys_path: list[str] | None = None
+
+        self.home = home
+        self.max_size = max_size
+        self.roots = tuple(roots)
+
+    def __len__(
+        self: Self,
+        /,
+    ) -> int:
+        return len(self._paths)
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        with self._lock:
+            self._paths.clear()
+            self._sys_path = None
+
+    def get(
+        self: Self,
+        filename: str,
+        separator: str = os.sep,
+        /,
+    ) -> str:
+        """
+        Gets the display path of a file.
+
+        Parameters
+        ----------
+        filename: :class:`str`
+            The name of the file, as in
+            :attr:`code.co_filename <types.CodeType.co_filename>`.
+        separator: :class:`str`
+            The separator to display between the components of the
+            path.
+
+
+        Returns
+        -------
+        :class:`str`
+            The display path.
+        """
+
+        key = (filename, separator)
+
+        with self._lock:
+            if self._sys_path != sys.path:
+                self._reset()
+
+            try:
+                return self._paths[key]
+            except KeyError:
+                prefixes = self._prefixes
+
+        path = self._shorten(filename, prefixes)
+
+        if separator != os.sep:
+            path = path.replace(os.sep, separator)
+
+        with self._lock:
+            self._paths[key] = path
+
+        return path
+
+    def _reset(
+        self: Self,
+        /,
+    ) -> None:
+        # NOTE: prefixes end with a separator and are sorted longest
+        #       first, so the first which matches is the longest.
+        prefixes = set()
+
+        for path in (*sys.path, *self.roots):
+            if not isinstance(path, str):
+                continue
+
+            try:
+                prefixes.add(os.path.join(os.path.abspath(path), ""))
+            except (OSError, ValueError):
+                pass
+
+        self._paths.clear()
+        self._prefixes = sorted(prefixes, key=len, reverse=True)
+        self._sys_path = list(sys.path)
+
+    def _shorten(
+        self: Self,
+        filename: str,
+        prefixes: list[str],
+        /,
+    ) -> str:
+        if not filename or (filename.startswith("<") and filename.endswith(">")):
+            return filename
+
+        try:
+            path = os.path.abspath(filename)
+        except (OSError, ValueError):
+            return filename
+
+        for prefix in prefixes:
+            if path.startswith(prefix) and len(path) > len(prefix):
+                return path[len(prefix) :]
+
+        if self.home:
+            home = os.path.join(os.path.expanduser("~"), "")
+
+            if home != os.path.join("~", "") and path.startswith(home):
+                return os.path.join("~", path[len(home) :])
+
+        return filename
+
+
+__all__ = [
+    "PathCache",
+]
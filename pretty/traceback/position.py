@@ -0,0 +1,330 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from typing_extensions import Self
+
+    from types import CodeType
+
+import array
+import ast
+import sys
+import threading
+
+import pretty
+
+
+# NOTE: the binary operators which are two characters long.
+_long_operators = frozenset(["**", "//", "<<", ">>"])
+
+
+def _get_character_offset(
+    line: str,
+    offset: int,
+    /,
+) -> int:
+    # NOTE: columns in position tables and ASTs are UTF-8 byte offsets.
+    if line.isascii():
+        return offset
+
+    return len(line.encode("utf-8")[:offset].decode("utf-8", "replace"))
+
+
+def _find_carets(
+    line: str,
+    start_line: int,
+    end_line: int | None,
+    start_column: int,
+    end_column: int,
+    /,
+) -> tuple[int, int, int, int] | None:
+    content_start = len(line) - len(line.lstrip())
+    content_end = len(line.rstrip())
+
+    start = _get_character_offset(line, start_column)
+
+    if end_line is None or end_line == start_line:
+        end = min(_get_character_offset(line, end_column), content_end)
+    else:
+        end = content_end
+
+    if start >= end:
+        return None
+
+    anchors = None
+
+    if end_line is None or end_line == start_line:
+        # NOTE: the segment is not necessarily valid on its own.
+        try:
+            anchors = _find_anchors(line[start:end])
+        except Exception:
+            pass
+
+    if anchors is None:
+        # NOTE: carets under the whole line would add nothing.
+        if start <= content_start and end >= content_end:
+            return None
+
+        return (start, end, start, end)
+
+    return (start, end, start + anchors[0], start + anchors[1])
+
+
+def _find_anchors(
+    segment: str,
+    /,
+) -> tuple[int, int] | None:
+    tree = ast.parse(segment)
+
+    if len(tree.body) != 1 or not isinstance(tree.body[0], ast.Expr):
+        return None
+
+    expr = tree.body[0].value
+
+    if isinstance(expr, ast.BinOp):
+        # NOTE: the operator is the first character after the left
+        #       operand which is not whitespace or a closing parenthesis.
+        anchor_start = _get_character_offset(segment, expr.left.end_col_offset)  # type: ignore  # parsed from source
+
+        while anchor_start < len(segment) and (segment[anchor_start].isspace() or segment[anchor_start] == ")"):
+            anchor_start += 1
+
+        if segment[anchor_start : anchor_start + 2] in _long_operators:
+            return (anchor_start, anchor_start + 2)
+
+        return (anchor_start, anchor_start + 1)
+
+    if isinstance(expr, ast.Subscript):
+        anchor_start = _get_character_offset(segment, expr.value.end_col_offset)  # type: ignore  # parsed from source
+        anchor_end = _get_character_offset(segment, expr.slice.end_col_offset)  # type: ignore  # parsed from source
+
+        while anchor_start < len(segment) and segment[anchor_start] != "[":
+            anchor_start += 1
+
+        while anchor_end < len(segment) and segment[anchor_end] != "]":
+            anchor_end += 1
+
+        return (anchor_start, min(anchor_end + 1, len(segment)))
+
+    return None
+
+
+class PositionCache:
+    """
+    A bounded, thread-safe cache of decoded code object position tables.
+
+    :meth:`code.co_positions` decodes a code object's position table
+    linearly from its start, which makes looking up the position of a
+    single instruction O(n) in the size of the code object. This cache
+    decodes each code object at most once into a flat array, after
+    which lookups are O(1).
+
+    The carets displayed under the source of an instruction, which may
+    require parsing the source, are cached in the same way.
+
+    .. note::
+
+        Position tables only exist in Python 3.11 and higher.
+
+    Parameters
+    ----------
+    max_size: :class:`int`
+        The maximum number of code objects to keep decoded, and of
+        instruction positions to keep the carets of.
+
+    Attributes
+    ----------
+    caret_hits: :class:`int`
+        The number of lookups of carets answered from the cache.
+    caret_misses: :class:`int`
+        The number of lookups of carets which required them to be
+        found.
+    hits: :class:`int`
+        The number of lookups of positions answered from the cache.
+    max_size: :class:`int`
+        The maximum number of code objects to keep decoded, and of
+        instruction positions to keep the carets of.
+    misses: :class:`int`
+        The number of lookups of positions which required a code
+        object to be decoded.
+    """
+
+    __slots__ = ("_carets", "_lock", "_tables", "caret_hits", "caret_misses", "hits", "max_size", "misses")
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_size: int = 256,
+    ) -> None:
+        if max_size < 1:
+            raise ValueError("max_size must be a positive integer")
+
+        self._carets: pretty.utility.LRUCache[tuple[CodeType, int, int | None, int, int, str], tuple[int, int, int, int] | None] = pretty.utility.LRUCache(max_size=max_size)
+        self._lock = threading.Lock()
+        # NOTE: code objects compare equal only when their position
+        #       tables do, so sharing a table between them is fine.
+        self._tables: pretty.utility.LRUCache[CodeType, array.array[int]] = pretty.utility.LRUCache(max_size=max_size)
+
+        self.caret_hits = 0
+        self.caret_misses = 0
+        self.hits = 0
+        self.max_size = max_size
+        self.misses = 0
+
+    def __len__(
+        self: Self,
+        /,
+    ) -> int:
+        return len(self._tables)
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache and its statistics.
+        """
+
+        with self._lock:
+            self._carets.clear()
+            self._tables.clear()
+
+            self.caret_hits = 0
+            self.caret_misses = 0
+            self.hits = 0
+            self.misses = 0
+
+    def get(
+        self: Self,
+        code: CodeType,
+        lasti: int,
+        /,
+    ) -> tuple[int | None, int | None, int | None, int | None]:
+        """
+        Gets the position of an instruction.
+
+        Parameters
+        ----------
+        code: :class:`~types.CodeType`
+            A code object.
+        lasti: :class:`int`
+            The offset of an instruction in the code object, as in
+            :attr:`traceback.tb_lasti <types.TracebackType.tb_lasti>`.
+
+
+        Returns
+        -------
+        Tuple[ \
+            Optional[:class:`int`], \
+            Optional[:class:`int`], \
+            Optional[:class:`int`], \
+            Optional[:class:`int`] \
+        ]
+            The start line, end line, start column, and end column of
+            the instruction.
+        """
+
+        with self._lock:
+            try:
+                table = self._tables[code]
+            except KeyError:
+                table = None
+                self.misses += 1
+            else:
+                self.hits += 1
+
+        if table is None:
+            # NOTE: decoded outside of the lock, at worst twice.
+            if sys.version_info >= (3, 11):
+                table = array.array("i", [-1 if value is None else value for position in code.co_positions() for value in position])
+            else:
+                # NOTE: code objects have no position table before
+                #       Python 3.11, so every position is unknown.
+                table = array.array("i")
+
+            with self._lock:
+                self._tables[code] = table
+
+        i = lasti // 2 * 4
+
+        if i < 0 or i + 4 > len(table):
+            return (None, None, None, None)
+
+        start_line, end_line, start_column, end_column = table[i : i + 4]
+
+        return (
+            None if start_line == -1 else start_line,
+            None if end_line == -1 else end_line,
+            None if start_column == -1 else start_column,
+            None if end_column == -1 else end_column,
+        )
+
+    def get_carets(
+        self: Self,
+        code: CodeType,
+        position: tuple[int, int | None, int | None, int | None],
+        line: str,
+        /,
+    ) -> tuple[int, int, int, int] | None:
+        """
+        Gets the carets to display under the source of an instruction.
+
+        As in :mod:`traceback`, the carets underline the instruction's
+        expression, with the operator of a binary operation or the
+        brackets of a subscript as its anchor.
+
+        Parameters
+        ----------
+        code: :class:`~types.CodeType`
+            A code object.
+        position: Tuple[ \
+                      :class:`int`, \
+                      Optional[:class:`int`], \
+                      Optional[:class:`int`], \
+                      Optional[:class:`int`] \
+                  ]
+            The position of an instruction in the code object, as
+            returned by :meth:`get`.
+        line: :class:`str`
+            The first line of the instruction's source.
+
+
+        Returns
+        -------
+        Optional[Tuple[:class:`int`, :class:`int`, :class:`int`, :class:`int`]]
+            The start and end columns of the expression and of its
+            anchor, in characters, or ``None`` when no carets should be
+            displayed.
+        """
+
+        start_line, end_line, start_column, end_column = position
+
+        if start_column is None or end_column is None:
+            return None
+
+        # NOTE: the line is part of the key, as the source file may have
+        #       changed since the code object was compiled.
+        key = (code, start_line, end_line, start_column, end_column, line)
+
+        with self._lock:
+            try:
+                carets = self._carets[key]
+            except KeyError:
+                self.caret_misses += 1
+            else:
+                self.caret_hits += 1
+                return carets
+
+        # NOTE: found outside of the lock, at worst twice.
+        carets = _find_carets(line.rstrip("\r\n"), start_line, end_line, start_column, end_column)
+
+        with self._lock:
+            self._carets[key] = carets
+
+        return carets
+
+
+__all__ = [
+    "PositionCache",
+]
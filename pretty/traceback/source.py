@@ -0,0 +1,605 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Iterator
+    from typing import Any
+    from typing_extensions import Self
+
+import array
+import bisect
+import collections
+import io
+import itertools
+import keyword
+import linecache
+import mmap
+import os
+import threading
+import token
+import tokenize
+
+import pretty
+
+
+# NOTE: files up to this size are read into memory, and larger files
+#       are memory-mapped only for the duration of each lookup, so no
+#       file is kept open, which would lock it on Windows.
+_copy_size = 1024 * 1024
+_index_chunk_size = 64 * 1024
+
+_span_delimiters = frozenset(["(", ")", "[", "]", "{", "}", ",", ".", ":", ";", "->"])
+# NOTE: the end column of spans which extend to the end of their line.
+_span_end = 2**31 - 1
+_span_kinds = ("bool", "bytes", "comment", "complex", "delimiter", "ellipsis", "float", "int", "keyword", "name", "none", "operator", "str")
+_span_kind_indexes = {kind: i for i, kind in enumerate(_span_kinds)}
+_span_names = {"False": "bool", "None": "none", "True": "bool"}
+# NOTE: f-strings are tokenized into parts in Python 3.12 and higher,
+#       and t-strings in Python 3.14 and higher.
+_span_string_types = frozenset(getattr(token, name) for name in ("STRING", "FSTRING_START", "FSTRING_MIDDLE", "FSTRING_END", "TSTRING_START", "TSTRING_MIDDLE", "TSTRING_END") if hasattr(token, name))
+
+
+class _Source:
+    __slots__ = ("copied", "encoding", "filename", "map", "mtime", "offsets", "size", "span_lines", "spans", "tokenized", "tokens")
+
+    def __init__(
+        self: Self,
+        filename: str,
+        map: bytes | mmap.mmap | None,
+        mtime: int,
+        size: int,
+        /,
+    ) -> None:
+        self.copied = not isinstance(map, mmap.mmap)
+        self.encoding: str | None = None
+        self.filename = filename
+        self.map = map
+        self.mtime = mtime
+        # NOTE: offsets[i] is the offset of the start of line i + 1. the
+        #       index is built lazily, only as far as it is needed.
+        self.offsets = array.array("q", [0])
+        self.size = size
+        # NOTE: span_lines[i] is the line of the span at spans[3 * i],
+        #       which is a (start column, end column, kind) triple. the
+        #       file is tokenized lazily, only as far as it is needed.
+        self.span_lines = array.array("i")
+        self.spans = array.array("i")
+        self.tokenized = 0
+        self.tokens: Iterator[tokenize.TokenInfo] | None = None
+
+    @property
+    def nbytes(
+        self: Self,
+        /,
+    ) -> int:
+        # NOTE: the size of a memory-mapped file is not counted, as it
+        #       is only mapped for the duration of each lookup.
+        return (self.size if self.copied else 0) + self.offsets.itemsize * len(self.offsets) + self.span_lines.itemsize * len(self.span_lines) + self.spans.itemsize * len(self.spans)
+
+    def close(
+        self: Self,
+        /,
+    ) -> None:
+        if isinstance(self.map, mmap.mmap):
+            self.map.close()
+            self.map = None
+
+    def open(
+        self: Self,
+        /,
+    ) -> bool:
+        if self.map is not None or self.copied:
+            return True
+
+        try:
+            with open(self.filename, "rb") as stream:
+                map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return False
+
+        # NOTE: the file may have changed since it was indexed.
+        if len(map) != self.size:
+            map.close()
+            return False
+
+        self.map = map
+
+        return True
+
+    def index(
+        self: Self,
+        lineno: int,
+        /,
+    ) -> bool:
+        offsets = self.offsets
+        map = self.map
+
+        if map is None:
+            return False
+
+        while len(offsets) <= lineno:
+            start = offsets[-1]
+
+            if start >= self.size:
+                return False
+
+            # NOTE: the index is extended a chunk at a time, rather than
+            #       a line at a time, to keep the per-line work in C.
+            end = map.rfind(b"\n", start, start + _index_chunk_size) + 1
+            if end == 0:
+                end = map.find(b"\n", start) + 1 or self.size
+
+            parts = map[start:end].split(b"\n")
+            if not parts[-1]:
+                parts.pop()
+
+            lengths = [len(part) + 1 for part in parts]
+            lengths[0] += start
+            offsets.extend(itertools.accumulate(lengths))
+
+            if offsets[-1] > self.size:
+                offsets[-1] = self.size
+
+        return True
+
+    def line(
+        self: Self,
+        lineno: int,
+        /,
+    ) -> str:
+        if lineno < 1 or not self.index(lineno):
+            return ""
+
+        data = self.map[self.offsets[lineno - 1] : self.offsets[lineno]]  # type: ignore  # index checks the map
+
+        if self.encoding is None:
+            self.encoding = self.detect_encoding()
+
+        try:
+            line = data.decode(self.encoding)
+        except (LookupError, UnicodeDecodeError):
+            line = data.decode("utf-8", "replace")
+
+        if lineno == 1:
+            line = line.lstrip("\ufeff")
+
+        return line.rstrip("\r\n") + "\n"
+
+    def get_spans(
+        self: Self,
+        lineno: int,
+        /,
+    ) -> tuple[tuple[int, int, str], ...]:
+        if lineno > self.tokenized:
+            self.tokenize(lineno)
+
+        span_lines = self.span_lines
+        spans = self.spans
+
+        start = bisect.bisect_left(span_lines, lineno)
+        end = bisect.bisect_right(span_lines, lineno, start)
+
+        return tuple((spans[i * 3], spans[i * 3 + 1], _span_kinds[spans[i * 3 + 2]]) for i in range(start, end))
+
+    def tokenize(
+        self: Self,
+        lineno: int,
+        /,
+    ) -> None:
+        if self.tokens is None:
+            self.tokens = tokenize.generate_tokens(map(self.line, itertools.count(1)).__next__)
+
+        span_lines = self.span_lines
+        spans = self.spans
+
+        try:
+            for type, string, (start_line, start_column), (end_line, end_column), _ in self.tokens:
+                if type == token.OP:
+                    if string == "...":
+                        kind = "ellipsis"
+                    elif string in _span_delimiters:
+                        kind = "delimiter"
+                    else:
+                        kind = "operator"
+                elif type == token.NAME:
+                    if string in _span_names:
+                        kind = _span_names[string]
+                    elif keyword.iskeyword(string):
+                        kind = "keyword"
+                    else:
+                        kind = "name"
+                elif type in _span_string_types:
+                    if type == token.STRING and "b" in string[: string.find(string[-1])].lower():
+                        kind = "bytes"
+                    else:
+                        kind = "str"
+                elif type == token.NUMBER:
+                    if string[-1] in "jJ":
+                        kind = "complex"
+                    elif string[:2].lower() not in ("0x", "0o", "0b") and any(c in string for c in ".eE"):
+                        kind = "float"
+                    else:
+                        kind = "int"
+                elif type == token.COMMENT:
+                    kind = "comment"
+                else:
+                    kind = None
+
+                if kind is not None:
+                    kind_index = _span_kind_indexes[kind]
+
+                    # NOTE: tokens spanning several lines, like
+                    #       triple-quoted strings, are split into a span
+                    #       on each line.
+                    for line in range(start_line, end_line + 1):
+                        span_lines.append(line)
+                        spans.append(start_column if line == start_line else 0)
+                        spans.append(end_column if line == end_line else _span_end)
+                        spans.append(kind_index)
+
+                # NOTE: every line before the one a token starts on has
+                #       been tokenized completely.
+                self.tokenized = start_line - 1
+
+                if start_line > lineno:
+                    return
+        except (SyntaxError, tokenize.TokenError):
+            pass
+
+        self.tokenized = _span_end
+        self.tokens = iter(())
+
+    def detect_encoding(
+        self: Self,
+        /,
+    ) -> str:
+        self.index(2)
+
+        head = self.map[: self.offsets[min(2, len(self.offsets) - 1)]]  # type: ignore  # index checks the map
+
+        try:
+            encoding, _ = tokenize.detect_encoding(io.BytesIO(head).readline)
+        except SyntaxError:
+            encoding = "utf-8"
+
+        return encoding
+
+
+class SourceCache:
+    """
+    A bounded, thread-safe cache of source files.
+
+    Unlike :mod:`linecache`, which keeps every file it has ever read as
+    a list of strings, this cache keeps each file as bytes, or, for
+    files larger than 1 MiB, memory-maps it for the duration of each
+    lookup, and lazily builds a compact index of line offsets as lines
+    are requested. Each access validates the file by its modification
+    time and size, and the least recently used files are evicted when
+    the total size of cached files and their indexes exceeds a budget.
+
+    Each cached file is also tokenized, at most once per version, to
+    find the spans used for syntax highlighting. The spans of recently
+    requested lines are cached separately.
+
+    Sources which are not files on disk, like ``"<string>"`` or modules
+    loaded from a zip archive, are looked up in :mod:`linecache`.
+
+    Parameters
+    ----------
+    max_bytes: :class:`int`
+        The maximum total size of cached files and their indexes, in
+        bytes. Files larger than this are read without being cached.
+        Memory-mapped files only count towards this by their index.
+    max_lines: :class:`int`
+        The maximum number of lines to cache the spans of.
+
+    Attributes
+    ----------
+    max_bytes: :class:`int`
+        The maximum total size of cached files and their indexes, in
+        bytes.
+    """
+
+    __slots__ = ("_lock", "_nbytes", "_sources", "_spans", "max_bytes")
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_lines: int = 4096,
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be a non-negative integer")
+
+        if max_lines < 1:
+            raise ValueError("max_lines must be a positive integer")
+
+        self._lock = threading.Lock()
+        # NOTE: the running total of the nbytes of cached sources.
+        self._nbytes = 0
+        self._sources: collections.OrderedDict[str, _Source] = collections.OrderedDict()
+        self._spans: pretty.utility.LRUCache[tuple[str, int], tuple[int, int, tuple[tuple[int, int, str], ...]]] = pretty.utility.LRUCache(max_size=max_lines)
+
+        self.max_bytes = max_bytes
+
+    def __len__(
+        self: Self,
+        /,
+    ) -> int:
+        return len(self._sources)
+
+    @property
+    def nbytes(
+        self: Self,
+        /,
+    ) -> int:
+        """
+        The total size of cached files and their indexes, in bytes.
+
+        :type: :class:`int`
+        """
+
+        return self._nbytes
+
+    def clear(
+        self: Self,
+        /,
+    ) -> None:
+        """
+        Clears the cache.
+        """
+
+        with self._lock:
+            for source in self._sources.values():
+                source.close()
+
+            self._nbytes = 0
+            self._sources.clear()
+            self._spans.clear()
+
+    def get_line(
+        self: Self,
+        filename: str,
+        lineno: int,
+        /,
+        module_globals: dict[str, Any] | None = None,
+    ) -> str:
+        """
+        Gets a line of a source file.
+
+        This function is synonymous to :func:`linecache.getline`.
+
+        Parameters
+        ----------
+        filename: :class:`str`
+            The name of the source file.
+        lineno: :class:`int`
+            The line number, starting at 1.
+        module_globals: :class:`dict`
+            The globals of the module the source file belongs to, used
+            to find a :pep:`302` loader when the source file is not on
+            disk.
+
+
+        Returns
+        -------
+        :class:`str`
+            The line, ending with a newline, or an empty string when it
+            could not be found.
+        """
+
+        lines = self.get_lines(filename, lineno, lineno, module_globals)
+
+        return lines[0] if lines else ""
+
+    def get_lines(
+        self: Self,
+        filename: str,
+        start: int,
+        end: int,
+        /,
+        module_globals: dict[str, Any] | None = None,
+    ) -> list[str]:
+        """
+        Gets a range of lines of a source file.
+
+        Parameters
+        ----------
+        filename: :class:`str`
+            The name of the source file.
+        start: :class:`int`
+            The first line number, starting at 1.
+        end: :class:`int`
+            The last line number, inclusive.
+        module_globals: :class:`dict`
+            The globals of the module the source file belongs to, used
+            to find a :pep:`302` loader when the source file is not on
+            disk.
+
+
+        Returns
+        -------
+        List[:class:`str`]
+            The lines which could be found, each ending with a newline.
+        """
+
+        if not filename or (filename.startswith("<") and filename.endswith(">")):
+            return self._get_linecache_lines(filename, start, end, module_globals)
+
+        try:
+            stat = os.stat(filename)
+        except (OSError, ValueError):
+            return self._get_linecache_lines(filename, start, end, module_globals)
+
+        with self._lock:
+            source = self._get_source(filename, stat)
+
+            if source is None:
+                return self._get_linecache_lines(filename, start, end, module_globals)
+
+            nbytes = source.nbytes
+            lines = list()
+
+            for lineno in range(start, end + 1):
+                line = source.line(lineno)
+                if not line:
+                    break
+
+                lines.append(line)
+
+            self._release(filename, source, nbytes)
+
+        return lines
+
+    def get_spans(
+        self: Self,
+        filename: str,
+        lineno: int,
+        /,
+    ) -> tuple[tuple[int, int, str], ...]:
+        """
+        Gets the syntax highlighting spans of a line of a source file.
+
+        Spans are only found for files on disk which fit in the cache.
+
+        Parameters
+        ----------
+        filename: :class:`str`
+            The name of the source file.
+        lineno: :class:`int`
+            The line number, starting at 1.
+
+
+        Returns
+        -------
+        Tuple[Tuple[:class:`int`, :class:`int`, :class:`str`], ...]
+            The start column, end column, and kind of each span, in
+            order. The end column of a span which continues onto the
+            next line is past the end of the line. The kind is one of
+            ``"bool"``, ``"bytes"``, ``"comment"``, ``"complex"``,
+            ``"delimiter"``, ``"ellipsis"``, ``"float"``, ``"int"``,
+            ``"keyword"``, ``"name"``, ``"none"``, ``"operator"``, and
+            ``"str"``.
+        """
+
+        if not filename or (filename.startswith("<") and filename.endswith(">")):
+            return ()
+
+        try:
+            stat = os.stat(filename)
+        except (OSError, ValueError):
+            return ()
+
+        with self._lock:
+            source = self._get_source(filename, stat)
+
+            if source is None or filename not in self._sources:
+                if source is not None:
+                    source.close()
+
+                return ()
+
+            key = (filename, lineno)
+            entry = self._spans.get(key)
+
+            # NOTE: entries are validated the same way as files are.
+            if entry is not None and entry[0] == source.mtime and entry[1] == source.size:
+                source.close()
+                return entry[2]
+
+            nbytes = source.nbytes
+            spans = source.get_spans(lineno)
+            self._spans[key] = (source.mtime, source.size, spans)
+
+            self._release(filename, source, nbytes)
+
+        return spans
+
+    def _evict(
+        self: Self,
+        /,
+    ) -> None:
+        while self._nbytes > self.max_bytes and len(self._sources) > 1:
+            _, source = self._sources.popitem(last=False)
+            self._nbytes -= source.nbytes
+            source.close()
+
+    def _release(
+        self: Self,
+        filename: str,
+        source: _Source,
+        nbytes: int,
+        /,
+    ) -> None:
+        # NOTE: a source's index grows as it is used, by the difference
+        #       from nbytes, its size before.
+        if filename in self._sources:
+            self._nbytes += source.nbytes - nbytes
+            self._evict()
+
+        source.close()
+
+    def _get_source(
+        self: Self,
+        filename: str,
+        stat: os.stat_result,
+        /,
+    ) -> _Source | None:
+        source = self._sources.get(filename)
+
+        if source is not None and (source.mtime != stat.st_mtime_ns or source.size != stat.st_size or not source.open()):
+            del self._sources[filename]
+            self._nbytes -= source.nbytes
+            source.close()
+            source = None
+
+        if source is None:
+            source = self._open(filename, stat.st_mtime_ns, stat.st_size)
+
+            if source is not None and source.size <= self.max_bytes:
+                self._sources[filename] = source
+                self._nbytes += source.nbytes
+        else:
+            self._sources.move_to_end(filename)
+
+        return source
+
+    def _open(
+        self: Self,
+        filename: str,
+        mtime: int,
+        size: int,
+        /,
+    ) -> _Source | None:
+        if size == 0:
+            return _Source(filename, None, mtime, size)
+
+        try:
+            with open(filename, "rb") as stream:
+                if size <= _copy_size:
+                    map: bytes | mmap.mmap = stream.read()
+                else:
+                    map = mmap.mmap(stream.fileno(), 0, access=mmap.ACCESS_READ)
+        except (OSError, ValueError):
+            return None
+
+        # NOTE: the file may have changed between stat and open.
+        return _Source(filename, map, mtime, len(map))
+
+    def _get_linecache_lines(
+        self: Self,
+        filename: str,
+        start: int,
+        end: int,
+        module_globals: dict[str, Any] | None,
+        /,
+    ) -> list[str]:
+        lines = linecache.getlines(filename, module_globals)
+
+        return lines[max(start, 1) - 1 : max(end, 0)]
+
+
+__all__ = [
+    "SourceCache",
+]
@@ -6,6 +6,8 @@ from pretty.utility.environment import *
 from pretty.utility.environment import __all__ as _environment__all__
 from pretty.utility.logging import *
 from pretty.utility.logging import __all__ as _logging__all__
+from pretty.utility.representation import *
+from pretty.utility.representation import __all__ as _representation__all__
 
 
 __all__ = [  # pyright: ignore[reportUnsupportedDunderAll]
@@ -13,4 +15,5 @@ __all__ = [  # pyright: ignore[reportUnsupportedDunderAll]
     *_internal_old__all__,
     *_environment__all__,
     *_logging__all__,
+    *_representation__all__,
 ]
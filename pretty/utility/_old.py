@@ -6,6 +6,8 @@ if TYPE_CHECKING:
 
 import os
 import sys
+import threading
+import weakref
 
 
 if TYPE_CHECKING:
@@ -138,14 +140,96 @@ _bool_map = {
 _bool_map = {v: k for k in _bool_map.keys() for v in _bool_map[k]}
 
 
+# NOTE: resolved names of types, which are looked up for every
+#       exception formatted, keyed by id and holding a weak reference
+#       to the type so it can still be collected, along with the
+#       modules the name was resolved against. an entry is only used
+#       while each of those is still the module of its name in
+#       sys.modules, so a module replaced or reloaded in place is
+#       noticed. a type rebound to another name within a module which
+#       is not replaced is not. the cache is cleared whenever
+#       sys.modules is replaced or a module is added to or removed from
+#       it.
+_name_cache: dict[int, tuple[weakref.ref[type], str, tuple[tuple[str, Any], ...]]] = dict()
+_name_cache_modules: dict[str, Any] | None = None
+_name_cache_size = 0
+_name_cache_lock = threading.Lock()
+
+
 def try_name(
     obj: Any,
     *,
     default: _T,
 ) -> str | _T:
+    if not isinstance(obj, type):
+        return _resolve_name(obj) or default
+
+    modules = sys.modules
+    size = len(modules)
+
+    if modules is _name_cache_modules and size == _name_cache_size:
+        entry = _name_cache.get(id(obj))
+
+        if entry is not None and entry[0]() is obj:
+            for module_name, module in entry[2]:
+                if modules.get(module_name) is not module:
+                    break
+            else:
+                return entry[1]
+
+    resolved: list[tuple[str, Any]] = []
+
+    name = _resolve_name(obj, resolved)
+    if name is None:
+        return default
+
+    _cache_name(obj, name, tuple(resolved), modules, size)
+
+    return name
+
+
+def _cache_name(
+    obj: type,
+    name: str,
+    resolved: tuple[tuple[str, Any], ...],
+    modules: dict[str, Any],
+    size: int,
+) -> None:
+    global _name_cache_modules, _name_cache_size
+
+    obj_id = id(obj)
+
+    def _remove(
+        ref: weakref.ref[type],
+    ) -> None:
+        # NOTE: this may be called by the garbage collector while the
+        #       lock is held, so it must not acquire it.
+        entry = _name_cache.get(obj_id)
+
+        if entry is not None and entry[0] is ref:
+            _name_cache.pop(obj_id, None)
+
+    try:
+        ref = weakref.ref(obj, _remove)
+    except TypeError:
+        return
+
+    with _name_cache_lock:
+        if modules is not _name_cache_modules or size != _name_cache_size:
+            _name_cache.clear()
+            _name_cache_modules = modules
+            _name_cache_size = size
+
+        _name_cache[obj_id] = (ref, name, resolved)
+
+
+def _resolve_name(
+    obj: Any,
+    resolved: list[tuple[str, Any]] | None = None,
+) -> str | None:
     name = try_attr(obj, "__qualname__", default=None) or try_attr(obj, "__name__", default=None)
     if not name:
-        return default
+        return None
 
     module = try_attr(obj, "__module__", default=None)
 
@@ -159,8 +243,14 @@ def try_name(
             try:
                 module_type = sys.modules[module_test]
             except KeyError:
+                if resolved is not None:
+                    resolved.append((module_test, None))
+
                 break
 
+            if resolved is not None:
+                resolved.append((module_test, module_type))
+
             obj_test = module_type
             for part in name.split("."):
                 obj_test = try_attr(obj_test, part, default=None)
@@ -202,6 +292,7 @@ def try_str(
 
 
 __all__ = [
+    "pretty_theme",
     "rindex",
     "sweeten",
     "try_attr",
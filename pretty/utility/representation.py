@@ -0,0 +1,634 @@
+from __future__ import annotations
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from collections.abc import Callable
+    from typing import Any
+    from typing_extensions import Self
+
+import collections
+import contextvars
+import itertools
+import os
+import queue
+import threading
+import time
+import weakref
+
+
+class _Representation:
+    __slots__ = ("deadline", "parts", "path", "remaining", "sgr", "truncated")
+
+    def __init__(
+        self: Self,
+        max_chars: int,
+        deadline: float | None,
+        sgr: dict[type, tuple[str, str]] | None,
+        /,
+    ) -> None:
+        self.deadline = deadline
+        self.parts: list[str] = []
+        self.path: set[int] = set()
+        self.remaining = max_chars
+        self.sgr = sgr
+        self.truncated = False
+
+    def write(
+        self: Self,
+        string: str,
+        /,
+    ) -> None:
+        if len(string) > self.remaining:
+            string = string[: self.remaining]
+            self.truncated = True
+
+        self.parts.append(string)
+        self.remaining -= len(string)
+
+    def write_literal(
+        self: Self,
+        string: str,
+        cls: type,
+        /,
+    ) -> None:
+        if self.sgr is None or cls not in self.sgr:
+            self.write(string)
+            return
+
+        if len(string) > self.remaining:
+            string = string[: self.remaining]
+            self.truncated = True
+
+        # NOTE: SGR sequences do not count towards max_chars.
+        start, end = self.sgr[cls]
+        self.parts.append(f"{start}{string}{end}")
+        self.remaining -= len(string)
+
+
+class _Worker:
+    __slots__ = ("tasks",)
+
+    def __init__(
+        self: Self,
+        /,
+    ) -> None:
+        self.tasks: queue.SimpleQueue[tuple[contextvars.Context, Callable[[Any], str], Any, list[Any]] | None] = queue.SimpleQueue()
+
+        threading.Thread(target=self.run, name="pretty.utility.Representer", daemon=True).start()
+
+    def run(
+        self: Self,
+        /,
+    ) -> None:
+        while True:
+            task = self.tasks.get()
+            if task is None:
+                return
+
+            context, function, obj, result = task
+
+            try:
+                result[1] = context.run(function, obj)
+            except BaseException as e:
+                result[2] = e
+
+            result[0].set()
+
+
+class Representer:
+    """
+    A size- and depth-bounded alternative to :func:`repr`.
+
+    Builtin types are represented by the representer itself, which
+    stops as soon as ``max_chars`` characters have been produced, so
+    that representing a large object costs no more than representing
+    a small one. Objects of other types, including subclasses of
+    builtin types, are represented with :func:`repr` and then
+    truncated.
+
+    Calls to :meth:`object.__repr__` of objects of other types are
+    skipped once a deadline has passed. A call which takes longer than
+    ``strike_threshold`` or runs past a deadline counts as a strike
+    against its type, and types with ``strike_cutoff`` strikes are no
+    longer called at all, in this or later representations. Such a
+    call is still waited for, however long it takes.
+
+    When a ``timeout`` is set, calls are instead made on a worker
+    thread and abandoned, as a strike, when they take longer than the
+    timeout or run past a deadline. These calls are made in a copy of
+    the calling thread's :mod:`contextvars` context, so context
+    variables keep their values, but :class:`threading.local` data
+    does not.
+
+    .. warning::
+
+        An abandoned call keeps running on its worker thread until it
+        returns, which may be never, at the same time as the thread
+        which abandoned it. Only set a ``timeout`` when the objects
+        represented are safe to use from several threads at once.
+
+    Parameters
+    ----------
+    max_chars: :class:`int`
+        The maximum number of characters in a representation.
+    max_depth: :class:`int`
+        The maximum depth of nested containers to represent.
+    max_items: :class:`int`
+        The maximum number of items of a container to represent.
+    strike_cutoff: :class:`int`
+        The number of strikes against a type before its methods are
+        no longer called.
+    strike_threshold: :class:`float`
+        The time, in seconds, a call to :meth:`object.__repr__` made
+        without a ``timeout`` may take before it counts as a strike.
+    timeout: Optional[:class:`float`]
+        The maximum time, in seconds, to wait for a call to
+        :meth:`object.__repr__`. When ``None``, calls are made
+        directly and never abandoned. Defaults to ``None``.
+
+    Attributes
+    ----------
+    max_chars: :class:`int`
+        The maximum number of characters in a representation.
+    max_depth: :class:`int`
+        The maximum depth of nested containers to represent.
+    max_items: :class:`int`
+        The maximum number of items of a container to represent.
+    placeholder: :class:`str`
+        The text which replaces elided characters, items, and
+        containers.
+    strike_cutoff: :class:`int`
+        The number of strikes against a type before its methods are
+        no longer called.
+    strike_threshold: :class:`float`
+        The time, in seconds, a call to :meth:`object.__repr__` made
+        without a ``timeout`` may take before it counts as a strike.
+    timeout: Optional[:class:`float`]
+        The maximum time, in seconds, to wait for a call to
+        :meth:`object.__repr__`.
+    """
+
+    __slots__ = ("__weakref__", "_dispatch", "_lock", "_strikes", "_workers", "max_chars", "max_depth", "max_items", "strike_cutoff", "strike_threshold", "timeout")
+
+    placeholder = "..."
+
+    def __init__(
+        self: Self,
+        /,
+        *,
+        max_chars: int = 1024,
+        max_depth: int = 6,
+        max_items: int = 64,
+        strike_cutoff: int = 2,
+        strike_threshold: float = 0.25,
+        timeout: float | None = None,
+    ) -> None:
+        if max_chars < 1:
+            raise ValueError("max_chars must be a positive integer")
+
+        if max_depth < 0:
+            raise ValueError("max_depth must be a non-negative integer")
+
+        if max_items < 0:
+            raise ValueError("max_items must be a non-negative integer")
+
+        if strike_cutoff < 1:
+            raise ValueError("strike_cutoff must be a positive integer")
+
+        if strike_threshold <= 0:
+            raise ValueError("strike_threshold must be a positive number")
+
+        if timeout is not None and timeout <= 0:
+            raise ValueError("timeout must be a positive number or None")
+
+        self._dispatch: dict[type, Callable[[_Representation, Any, int], None]] = {
+            bool: self._represent_builtin,
+            bytearray: self._represent_bytearray,
+            bytes: self._represent_bytes,
+            collections.deque: self._represent_deque,
+            complex: self._represent_builtin,
+            dict: self._represent_dict,
+            float: self._represent_builtin,
+            frozenset: self._represent_frozenset,
+            int: self._represent_int,
+            list: self._represent_list,
+            set: self._represent_set,
+            str: self._represent_str,
+            tuple: self._represent_tuple,
+            type(None): self._represent_builtin,
+            type(Ellipsis): self._represent_builtin,
+        }
+
+        self._lock = threading.Lock()
+        self._strikes: weakref.WeakKeyDictionary[type, int] = weakref.WeakKeyDictionary()
+        self._workers: list[_Worker] = []
+
+        self.max_chars = max_chars
+        self.max_depth = max_depth
+        self.max_items = max_items
+        self.strike_cutoff = strike_cutoff
+        self.strike_threshold = strike_threshold
+        self.timeout = timeout
+
+        _representers.add(self)
+
+    def represent(
+        self: Self,
+        obj: Any,
+        /,
+        *,
+        max_chars: int | None = None,
+        deadline: float | None = None,
+        sgr: dict[type, tuple[str, str]] | None = None,
+    ) -> str:
+        """
+        Represents an object.
+
+        Parameters
+        ----------
+        obj: Any
+            The object to represent.
+        max_chars: Optional[:class:`int`]
+            The maximum number of characters in the representation.
+            Defaults to ``max_chars``.
+        deadline: Optional[:class:`float`]
+            The :func:`time.monotonic` time after which calls to
+            :meth:`object.__repr__` are no longer made.
+        sgr: Optional[Dict[:class:`type`, Tuple[:class:`str`, :class:`str`]]]
+            The ANSI SGR escape sequences to start and end the
+            representations of builtin literals of each type with,
+            including those inside of containers. These sequences do
+            not count towards ``max_chars``.
+
+
+        Returns
+        -------
+        :class:`str`
+            The representation, ending with ``placeholder`` when it
+            was truncated.
+        """
+
+        if max_chars is None or max_chars > self.max_chars:
+            max_chars = self.max_chars
+
+        representation = _Representation(max(max_chars, 0), deadline, sgr or None)
+
+        try:
+            self._represent(representation, obj, 0)
+        except Exception:
+            # NOTE: e.g. a container changed size during iteration.
+            return "<value.__repr__ failed>"
+
+        if representation.truncated:
+            representation.parts.append(self.placeholder)
+
+        return "".join(representation.parts)
+
+    def stringify(
+        self: Self,
+        obj: Any,
+        /,
+        *,
+        name: str = "value",
+    ) -> str:
+        """
+        Converts an object to a string, as with :class:`str`.
+
+        Unlike :meth:`represent`, the string is not truncated, and
+        :meth:`object.__str__` is always called directly, on the
+        calling thread. The call is not bounded in any way: it is
+        neither timed out, skipped past a deadline, nor skipped for
+        types with strikes against them.
+
+        Parameters
+        ----------
+        obj: Any
+            The object to convert.
+        name: :class:`str`
+            The name of the object used in the placeholder returned
+            when the conversion fails, e.g. ``"<value.__str__ failed>"``.
+
+
+        Returns
+        -------
+        :class:`str`
+            The string, or a placeholder when the conversion failed.
+        """
+
+        if obj.__class__ is str:
+            return obj
+
+        try:
+            return str(obj)
+        except Exception:
+            return f"<{name}.__str__ failed>"
+
+    def _call(
+        self: Self,
+        function: Callable[[Any], str],
+        obj: Any,
+        name: str,
+        deadline: float | None,
+        /,
+    ) -> str:
+        timeout = self.timeout
+        cls = obj.__class__
+
+        with self._lock:
+            strikes = self._strikes.get(cls, 0)
+
+        if strikes >= self.strike_cutoff:
+            return f"<{name} skipped>"
+
+        if timeout is None:
+            start = time.monotonic()
+
+            if deadline is not None and start >= deadline:
+                return f"<{name} skipped>"
+
+            try:
+                result = function(obj)
+            except Exception:
+                result = f"<{name} failed>"
+
+            # NOTE: the call cannot be interrupted, but a type whose
+            #       calls are slow is remembered, and no longer called.
+            end = time.monotonic()
+
+            if end - start > self.strike_threshold or (deadline is not None and end > deadline):
+                with self._lock:
+                    self._strikes[cls] = self._strikes.get(cls, 0) + 1
+
+            return result
+
+        if deadline is not None:
+            timeout = min(timeout, deadline - time.monotonic())
+
+            if timeout <= 0:
+                return f"<{name} skipped>"
+
+        with self._lock:
+            worker = self._workers.pop() if self._workers else None
+
+        if worker is None:
+            try:
+                worker = _Worker()
+            except RuntimeError:
+                # NOTE: threads can no longer be started, e.g. at
+                #       interpreter shutdown, so the call is made
+                #       directly.
+                try:
+                    return function(obj)
+                except Exception:
+                    return f"<{name} failed>"
+
+        result: list[Any] = [threading.Event(), None, None]
+        worker.tasks.put((contextvars.copy_context(), function, obj, result))
+
+        if not result[0].wait(timeout):
+            # NOTE: the worker is abandoned, and exits once the call
+            #       eventually returns.
+            worker.tasks.put(None)
+
+            with self._lock:
+                self._strikes[cls] = self._strikes.get(cls, 0) + 1
+
+            return f"<{name} timed out>"
+
+        with self._lock:
+            self._workers.append(worker)
+
+        if result[2] is not None or not isinstance(result[1], str):
+            return f"<{name} failed>"
+
+        return result[1]
+
+    def _represent(
+        self: Self,
+        representation: _Representation,
+        obj: Any,
+        depth: int,
+        /,
+    ) -> None:
+        if representation.remaining <= 0:
+            representation.truncated = True
+            return
+
+        function = self._dispatch.get(obj.__class__)
+
+        if function is None:
+            representation.write(self._call(repr, obj, "value.__repr__", representation.deadline))
+        else:
+            function(representation, obj, depth)
+
+    def _represent_builtin(
+        self: Self,
+        representation: _Representation,
+        obj: Any,
+        depth: int,
+        /,
+    ) -> None:
+        representation.write_literal(repr(obj), obj.__class__)
+
+    def _represent_bytearray(
+        self: Self,
+        representation: _Representation,
+        obj: bytearray,
+        depth: int,
+        /,
+    ) -> None:
+        representation.write("bytearray(")
+
+        size = representation.remaining
+        representation.write_literal(repr(bytes(obj[:size])), bytes)
+
+        if len(obj) > size:
+            representation.truncated = True
+        else:
+            representation.write(")")
+
+    def _represent_bytes(
+        self: Self,
+        representation: _Representation,
+        obj: bytes,
+        depth: int,
+        /,
+    ) -> None:
+        # NOTE: only as many bytes as could possibly be displayed are
+        #       represented, as each is represented by at least one
+        #       character.
+        if len(obj) > representation.remaining:
+            representation.write_literal(repr(obj[: representation.remaining]), bytes)
+            representation.truncated = True
+        else:
+            representation.write_literal(repr(obj), bytes)
+
+    def _represent_int(
+        self: Self,
+        representation: _Representation,
+        obj: int,
+        depth: int,
+        /,
+    ) -> None:
+        # NOTE: converting an int to a decimal string is quadratic in
+        #       its size, and fails beyond sys.get_int_max_str_digits,
+        #       so large ints are only described.
+        digits = int(obj.bit_length() * 0.30103) + 1
+
+        if digits > min(max(representation.remaining, 64), 4096):
+            representation.write(f"<int of about {digits} digits>")
+        else:
+            representation.write_literal(repr(obj), int)
+
+    def _represent_str(
+        self: Self,
+        representation: _Representation,
+        obj: str,
+        depth: int,
+        /,
+    ) -> None:
+        if len(obj) > representation.remaining:
+            representation.write_literal(repr(obj[: representation.remaining]), str)
+            representation.truncated = True
+        else:
+            representation.write_literal(repr(obj), str)
+
+    def _represent_items(
+        self: Self,
+        representation: _Representation,
+        obj: Any,
+        depth: int,
+        start: str,
+        end: str,
+        /,
+        *,
+        mapping: bool = False,
+    ) -> None:
+        if not obj:
+            representation.write(f"{start}{end}")
+            return
+
+        if depth >= self.max_depth or id(obj) in representation.path:
+            representation.write(f"{start}{self.placeholder}{end}")
+            return
+
+        representation.path.add(id(obj))
+
+        try:
+            representation.write(start)
+
+            items = obj.items() if mapping else obj
+
+            for i, item in enumerate(itertools.islice(items, self.max_items)):
+                if i:
+                    representation.write(", ")
+
+                if mapping:
+                    self._represent(representation, item[0], depth + 1)
+                    representation.write(": ")
+                    self._represent(representation, item[1], depth + 1)
+                else:
+                    self._represent(representation, item, depth + 1)
+
+                if representation.remaining <= 0:
+                    representation.truncated = True
+                    return
+
+            if len(obj) > self.max_items:
+                representation.write(f", {self.placeholder}" if self.max_items else self.placeholder)
+            elif len(obj) == 1 and obj.__class__ is tuple:
+                representation.write(",")
+
+            representation.write(end)
+        finally:
+            representation.path.discard(id(obj))
+
+    def _represent_deque(
+        self: Self,
+        representation: _Representation,
+        obj: collections.deque[Any],
+        depth: int,
+        /,
+    ) -> None:
+        representation.write("deque(")
+        self._represent_items(representation, obj, depth, "[", "]")
+
+        if obj.maxlen is not None:
+            representation.write(f", maxlen={obj.maxlen}")
+
+        representation.write(")")
+
+    def _represent_dict(
+        self: Self,
+        representation: _Representation,
+        obj: dict[Any, Any],
+        depth: int,
+        /,
+    ) -> None:
+        self._represent_items(representation, obj, depth, "{", "}", mapping=True)
+
+    def _represent_frozenset(
+        self: Self,
+        representation: _Representation,
+        obj: frozenset[Any],
+        depth: int,
+        /,
+    ) -> None:
+        if not obj:
+            representation.write("frozenset()")
+        else:
+            representation.write("frozenset(")
+            self._represent_items(representation, obj, depth, "{", "}")
+            representation.write(")")
+
+    def _represent_list(
+        self: Self,
+        representation: _Representation,
+        obj: list[Any],
+        depth: int,
+        /,
+    ) -> None:
+        self._represent_items(representation, obj, depth, "[", "]")
+
+    def _represent_set(
+        self: Self,
+        representation: _Representation,
+        obj: set[Any],
+        depth: int,
+        /,
+    ) -> None:
+        if not obj:
+            representation.write("set()")
+        else:
+            self._represent_items(representation, obj, depth, "{", "}")
+
+    def _represent_tuple(
+        self: Self,
+        representation: _Representation,
+        obj: tuple[Any, ...],
+        depth: int,
+        /,
+    ) -> None:
+        self._represent_items(representation, obj, depth, "(", ")")
+
+
+_representers: weakref.WeakSet[Representer] = weakref.WeakSet()
+
+
+def _reset_representers() -> None:
+    # NOTE: worker threads do not survive a fork, so the child would
+    #       wait on dead workers and count strikes against types which
+    #       did nothing wrong.
+    for representer in _representers:
+        representer._lock = threading.Lock()
+        representer._strikes = weakref.WeakKeyDictionary()
+        representer._workers = []
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_reset_representers)
+
+
+__all__ = [
+    "Representer",
+]